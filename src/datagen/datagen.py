@@ -1,98 +1,219 @@
 # src/datagen/datagen.py
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional
+from src.datagen.gameshard import DEFAULT_SHARD_SIZE, GameShardWriter, shard_game_range
+from src.minesweeper.board import format_board
 from src.minesweeper.validboard import ValidBoard
-from src.minesweeper.minesweepersolver import MinesweeperSolver
+from src.minesweeper.minesweepersolver import MinesweeperSolver, SolverStep
 from src.globals import TRAINING_ROWS, TRAINING_COLS, TRAINING_MIN_MINES, TRAINING_MAX_MINES
+from src.models import GameMove, GameRecord
 from src.utils import get_base_directory
-import random
+import argparse
+import multiprocessing
+import numpy as np
 import shutil
 
+# Output formats: one directory of text files per game, or packed .npz shards
+FORMAT_TEXT = "text"
+FORMAT_SHARDS = "shards"
+
 
 class DataGenerator:
-    def __init__(self, output_dir: str = "data/train"):
+    def __init__(
+            self,
+            output_dir: str = "data/train",
+            seed: Optional[int] = None,
+            output_format: str = FORMAT_TEXT,
+            shard_size: int = DEFAULT_SHARD_SIZE,
+            rows: int = TRAINING_ROWS,
+            cols: int = TRAINING_COLS,
+            min_mines: int = TRAINING_MIN_MINES,
+            max_mines: int = TRAINING_MAX_MINES,
+        ):
+        """
+        seed: makes generated games reproducible (None draws fresh entropy).
+        output_format: FORMAT_TEXT (gameN/stepK.txt) or FORMAT_SHARDS (shardA-B.npz, shard_size games each).
+        rows, cols, min_mines, max_mines: board size and mine count range of every game.
+        """
+        if output_format not in (FORMAT_TEXT, FORMAT_SHARDS):
+            raise ValueError(f"Unknown output format: {output_format}")
+        if not 0 < min_mines <= max_mines:
+            raise ValueError(f"Invalid mine range: {min_mines}-{max_mines}")
+        # Mines are never placed in the 3x3 neighborhood of the first click, wherever it lands
+        free_cells = rows * cols - min(rows, 3) * min(cols, 3)
+        if max_mines > free_cells:
+            raise ValueError(f"Up to {max_mines} mines do not fit on a {rows}x{cols} board: only {free_cells} "
+                             f"cells are left outside the first click's 3x3 neighborhood")
         # Go two levels up from this file
         self.base_dir: Path = get_base_directory()
         self.output_dir: Path = (self.base_dir / output_dir).resolve()
         self.output_dir.mkdir(parents=True, exist_ok=True)
         print(f"[INFO] Storing game data in: {self.output_dir}")
 
+        self.seed: Optional[int] = seed
+        self.output_format: str = output_format
+        self.shard_size: int = shard_size
+        self.rows: int = rows
+        self.cols: int = cols
+        self.min_mines: int = min_mines
+        self.max_mines: int = max_mines
         self.game_counter: int = self._get_next_game_index()
 
     def _get_next_game_index(self) -> int:
         """
-        Determines the next game folder index (game0, game1, etc.)
+        Determines the next game index from game folders (game0, game1, etc.) and shard files.
         """
-        existing = [d.name for d in self.output_dir.iterdir() if d.is_dir() and d.name.startswith("game")]
-        indices = [int(d[4:]) for d in existing if d[4:].isdigit()]
+        indices = []
+        for path in self.output_dir.iterdir():
+            if path.is_dir() and path.name.startswith("game") and path.name[4:].isdigit():
+                indices.append(int(path.name[4:]))
+            elif (game_range := shard_game_range(path)) is not None:
+                indices.append(game_range[1] - 1)
         return max(indices, default=-1) + 1
 
-    def generate_games(self, num_games: int = 1):
+    def generate_games(self, num_games: int = 1, workers: int = 1):
         """
-        Generate multiple random games and store their solver steps
+        Generate multiple random games and store their solver steps.
+        Game indices are reserved up front (game_counter .. game_counter + num_games - 1)
+        and game i is seeded with SeedSequence(seed, spawn_key=(i,)), so with a fixed seed
+        the output is identical for any number of workers, and later calls (or generators
+        resuming in the same directory) continue with new games instead of replaying them.
         """
-        for _ in range(num_games):
-            self._generate_single_game()
-
-    def _generate_single_game(self):
-        mines = random.randint(TRAINING_MIN_MINES, TRAINING_MAX_MINES)
-        vb = ValidBoard(rows=TRAINING_ROWS, cols=TRAINING_COLS, mines=mines)
-
-        # Random first move location
-        first_r = random.randint(0, TRAINING_ROWS - 1)
-        first_c = random.randint(0, TRAINING_COLS - 1)
-        vb.reveal(first_r, first_c)
-
-        solver = MinesweeperSolver(vb.board)
-        step_states = []
-
-        # Monkey-patch board.print_board to capture intermediate states
-        original_print = vb.board.print_board
-
-        def capture_board(reveal_hidden: Optional[bool] = False):
-            from io import StringIO
-            import sys
-
-            buf = StringIO()
-            sys.stdout = buf
-            original_print(reveal_hidden)
-            sys.stdout = sys.__stdout__
-            step_states.append(buf.getvalue())
-
-        vb.board.print_board = capture_board
-        solver.solve(verbose=True)
-
-        # Save game folder
-        game_folder = self.output_dir / f"game{self.game_counter}"
-        if game_folder.exists():
-            shutil.rmtree(game_folder)
-        game_folder.mkdir(parents=True, exist_ok=True)
-
-        # Save all step files
-        for i, state in enumerate(step_states):
-            step_file = game_folder / f"step{i}.txt"
-            with open(step_file, "w") as f:
-                f.write(state)
-
-        # Save hidden board state
-        hidden_file = game_folder / "hidden_state.txt"
-        with open(hidden_file, "w") as f:
-            for row in vb.board.hidden_board:
-                f.write(" ".join(str(cell) for cell in row) + "\n")
-
-        # Save metadata
-        metadata_file = game_folder / "metadata.txt"
-        with open(metadata_file, "w") as f:
-            f.write(f"rows: {vb.rows}\n")
-            f.write(f"cols: {vb.cols}\n")
-            f.write(f"mines: {vb.mines}\n")
-            f.write(f"start_row: {first_r+1}\n")
-            f.write(f"start_col: {first_c+1}\n")
-
-        self.game_counter += 1
-        print(f"[INFO] Saved game {self.game_counter} to: {game_folder.resolve()} with {len(step_states)} solver steps.")
+        indices = range(self.game_counter, self.game_counter + num_games)
+        seeds = [np.random.SeedSequence(self.seed, spawn_key=(index,)) for index in indices]
+        generate = partial(
+            _generate_single_game,
+            rows=self.rows,
+            cols=self.cols,
+            min_mines=self.min_mines,
+            max_mines=self.max_mines,
+        )
+
+        if workers > 1:
+            chunksize = max(1, num_games // (workers * 4))
+            # Spawned rather than forked: forking a process that runs threads can deadlock the children
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                self._save_games(pool.map(generate, indices, seeds, chunksize=chunksize))
+        else:
+            self._save_games(map(generate, indices, seeds))
+
+        self.game_counter += num_games
+
+    def _save_games(self, records: Iterable[GameRecord]):
+        if self.output_format == FORMAT_SHARDS:
+            with GameShardWriter(self.output_dir, self.shard_size) as writer:
+                for record in records:
+                    writer.add(record)
+        else:
+            for record in records:
+                _save_text_game(self.output_dir, record)
+
+
+def _generate_single_game(
+        game_index: int,
+        seed: np.random.SeedSequence,
+        rows: int = TRAINING_ROWS,
+        cols: int = TRAINING_COLS,
+        min_mines: int = TRAINING_MIN_MINES,
+        max_mines: int = TRAINING_MAX_MINES,
+    ) -> GameRecord:
+    """
+    Generate one game and return its solver steps.
+    Module-level so that it can run in a worker process.
+    """
+    rng = np.random.default_rng(seed)
+    mines = int(rng.integers(min_mines, max_mines + 1))
+    vb = ValidBoard(rows=rows, cols=cols, mines=mines, rng=rng)
+
+    # Random first move location
+    first_r = int(rng.integers(rows))
+    first_c = int(rng.integers(cols))
+    vb.reveal(first_r, first_c)
+
+    initial_state = [row[:] for row in vb.board.board]
+    moves: List[GameMove] = []
+
+    # Record every solver move as a delta
+    def record_step(step: SolverStep):
+        moves.append(GameMove(step.row, step.col, step.action, step.revealed))
+
+    solver = MinesweeperSolver(vb.board)
+    solver.solve(tier=vb.tier, on_step=record_step)
+
+    return GameRecord(
+        game_index=game_index,
+        rows=vb.rows,
+        cols=vb.cols,
+        mines=vb.mines,
+        start_row=first_r,
+        start_col=first_c,
+        hidden_state=[[str(cell) for cell in row] for row in vb.board.hidden_board],
+        initial_state=initial_state,
+        moves=moves,
+    )
+
+
+def _save_text_game(output_dir: Path, record: GameRecord):
+    # Save game folder
+    game_folder = output_dir / f"game{record.game_index}"
+    if game_folder.exists():
+        shutil.rmtree(game_folder)
+    game_folder.mkdir(parents=True, exist_ok=True)
+
+    # Save all step files
+    for i, state in enumerate(record.iter_steps()):
+        step_file = game_folder / f"step{i}.txt"
+        with open(step_file, "w") as f:
+            f.write(format_board(state) + "\n")  # blank line after the board, as printed by print_board
+
+    # Save hidden board state
+    hidden_file = game_folder / "hidden_state.txt"
+    with open(hidden_file, "w") as f:
+        f.write(format_board(record.hidden_state))
+
+    # Save metadata
+    metadata_file = game_folder / "metadata.txt"
+    with open(metadata_file, "w") as f:
+        f.write(f"rows: {record.rows}\n")
+        f.write(f"cols: {record.cols}\n")
+        f.write(f"mines: {record.mines}\n")
+        f.write(f"start_row: {record.start_row+1}\n")
+        f.write(f"start_col: {record.start_col+1}\n")
+
+    print(f"[INFO] Saved game {record.game_index} to: {game_folder.resolve()} with {len(record.moves)} solver steps.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Minesweeper solver games.")
+    parser.add_argument("--games", type=int, default=10, help="Number of games to generate (default: 10)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible games (default: random)")
+    parser.add_argument("--output-dir", type=str, default="data/train", help="Output directory (default: data/train)")
+    parser.add_argument("--format", type=str, default=FORMAT_TEXT, choices=[FORMAT_TEXT, FORMAT_SHARDS],
+                        help="Output format (default: text)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help=f"Games per shard for --format shards (default: {DEFAULT_SHARD_SIZE})")
+    parser.add_argument("--rows", type=int, default=TRAINING_ROWS, help=f"Board rows (default: {TRAINING_ROWS})")
+    parser.add_argument("--cols", type=int, default=TRAINING_COLS, help=f"Board columns (default: {TRAINING_COLS})")
+    parser.add_argument("--min-mines", type=int, default=TRAINING_MIN_MINES,
+                        help=f"Fewest mines per board (default: {TRAINING_MIN_MINES})")
+    parser.add_argument("--max-mines", type=int, default=TRAINING_MAX_MINES,
+                        help=f"Most mines per board (default: {TRAINING_MAX_MINES})")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    generator = DataGenerator()
-    generator.generate_games(num_games=10)
+    args = parse_args()
+    generator = DataGenerator(
+        output_dir=args.output_dir,
+        seed=args.seed,
+        output_format=args.format,
+        shard_size=args.shard_size,
+        rows=args.rows,
+        cols=args.cols,
+        min_mines=args.min_mines,
+        max_mines=args.max_mines,
+    )
+    generator.generate_games(num_games=args.games, workers=args.workers)
@@ -0,0 +1,129 @@
+# src/datagen/gameshard.py
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import re
+import numpy as np
+
+from src.models import GameMove, GameRecord
+
+# Cells are stored as uint8 codes: numbers as themselves, then hidden, flag and mine
+CELL_SYMBOLS: List[str] = [str(n) for n in range(9)] + ["*", "F", "M"]
+CELL_CODES = {symbol: code for code, symbol in enumerate(CELL_SYMBOLS)}
+
+# Move actions are stored as codes
+ACTIONS: List[str] = ["reveal", "flag"]
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+DEFAULT_SHARD_SIZE = 1000
+SHARD_PATTERN = re.compile(r"shard(\d+)-(\d+)\.npz")
+
+
+def encode_board(board: List[List]) -> np.ndarray:
+    return np.array([[CELL_CODES[str(cell)] for cell in row] for row in board], dtype=np.uint8)
+
+
+def decode_board(codes: np.ndarray) -> List[List[str]]:
+    return [[CELL_SYMBOLS[code] for code in row] for row in codes.tolist()]
+
+
+def shard_game_range(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns the [start, stop) game indices stored in a shard file, or None if the name is not a shard.
+    """
+    match = SHARD_PATTERN.fullmatch(path.name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+class GameShardWriter:
+    """
+    Buffers games and writes them `shard_size` at a time to output_dir/shard{start}-{stop}.npz.
+    Games are delta-encoded: the hidden board and the board after the first click as uint8 codes,
+    then one (row, col, action) triple per solver move plus the flat indices of the cells each
+    reveal uncovered. Everything is concatenated across games into a handful of arrays, with
+    per-game shapes and counts to split them again.
+    """
+
+    def __init__(self, output_dir: Path, shard_size: int = DEFAULT_SHARD_SIZE):
+        self.output_dir: Path = output_dir
+        self.shard_size: int = shard_size
+        self.buffer: List[GameRecord] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record: GameRecord) -> None:
+        self.buffer.append(record)
+        if len(self.buffer) >= self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        records = self.buffer
+        start, stop = records[0].game_index, records[-1].game_index + 1
+        path = self.output_dir / f"shard{start}-{stop}.npz"
+        moves = [move for r in records for move in r.moves]
+        np.savez_compressed(
+            path,
+            game_index=np.array([r.game_index for r in records], dtype=np.int64),
+            shape=np.array([(r.rows, r.cols) for r in records], dtype=np.int32),
+            mines=np.array([r.mines for r in records], dtype=np.int32),
+            start=np.array([(r.start_row, r.start_col) for r in records], dtype=np.int32),
+            hidden=np.concatenate([encode_board(r.hidden_state).ravel() for r in records]),
+            initial=np.concatenate([encode_board(r.initial_state).ravel() for r in records]),
+            move_count=np.array([len(r.moves) for r in records], dtype=np.int32),
+            moves=np.array([(m.row, m.col, ACTION_CODES[m.action]) for m in moves], dtype=np.int16).reshape(-1, 3),
+            revealed_count=np.array([len(m.revealed) for m in moves], dtype=np.int32),
+            revealed=np.array(
+                [r * record.cols + c for record in records for m in record.moves for r, c in m.revealed],
+                dtype=np.int32,
+            ),
+        )
+        print(f"[INFO] Saved {len(records)} games to: {path}")
+        self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+def read_game_shard(path: Path) -> Iterator[GameRecord]:
+    """
+    Yield the games stored in a shard written by GameShardWriter.
+    Boards of individual steps are not materialized; use GameRecord.iter_steps/board_at.
+    """
+    with np.load(path) as shard:
+        game_index, shape, mines, start = shard["game_index"], shard["shape"], shard["mines"], shard["start"]
+        hidden, initial = shard["hidden"], shard["initial"]
+        move_count, moves = shard["move_count"], shard["moves"].tolist()
+        revealed_count, revealed = shard["revealed_count"], shard["revealed"].tolist()
+
+    board_offset = 0
+    move_offset = 0
+    revealed_offsets = np.concatenate([[0], np.cumsum(revealed_count)]).tolist()
+    for i in range(len(game_index)):
+        rows, cols = int(shape[i][0]), int(shape[i][1])
+        size = rows * cols
+        n_moves = int(move_count[i])
+
+        game_moves: List[GameMove] = []
+        for m in range(move_offset, move_offset + n_moves):
+            row, col, action = moves[m]
+            cells = revealed[revealed_offsets[m]:revealed_offsets[m + 1]]
+            game_moves.append(GameMove(row, col, ACTIONS[action], [divmod(cell, cols) for cell in cells]))
+
+        yield GameRecord(
+            game_index=int(game_index[i]),
+            rows=rows,
+            cols=cols,
+            mines=int(mines[i]),
+            start_row=int(start[i][0]),
+            start_col=int(start[i][1]),
+            hidden_state=decode_board(hidden[board_offset:board_offset + size].reshape(rows, cols)),
+            initial_state=decode_board(initial[board_offset:board_offset + size].reshape(rows, cols)),
+            moves=game_moves,
+        )
+        board_offset += size
+        move_offset += n_moves
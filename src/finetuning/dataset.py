@@ -1,73 +1,362 @@
 # src/finetuning/dataset.py
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import multiprocessing
 import random
+import shutil
+import time
 
 from src.utils import get_base_directory
-from src.models import MinesweeperExample
-from src.finetuning.prompt import format_example
-from datasets import Dataset
+from src.models import GameRecord, MinesweeperExample
+from src.finetuning.encoders import get_encoder
+from src.finetuning.prompt import format_example, format_move
+from src.datagen.gameshard import read_game_shard
+from src.minesweeper.board import format_board
+from datasets import Dataset, Features, IterableDataset, Value
+
+DEFAULT_SHUFFLE_BUFFER = 10000
+
+# Parallel loading: game directories per task, and I/O threads per parsing process
+LOAD_CHUNK_SIZE = 64
+IO_THREADS_PER_WORKER = 4
+
+# Bump when the rows built by _to_row change, so that old caches are not reused
+CACHE_VERSION = 3
+CACHE_DIR_NAME = ".cache"
+# Cache entry name prefix for loaders that send the stored board text (encoder=None)
+STORED_INPUT_CACHE_PREFIX = "stored"
+
+# Small board rendered through format_example for the cache key, so that any change to the
+# system prompt, an encoder description or an encoding invalidates cached prompts
+CACHE_PROBE_EXAMPLE = MinesweeperExample(
+    input="1 F *\n1 1 *\n",
+    board_state=[["1", "F", "*"], ["1", "1", "*"]],
+    hidden_state=[["1", "M", "1"], ["1", "1", "1"]],
+)
+
+# Column types of the rows built by MinesweeperDatasetLoader._to_row
+ROW_FEATURES = Features({
+    "prompt": [{"role": Value("string"), "content": Value("string")}],
+    "board_state": [[Value("string")]],
+    "hidden_state": [[Value("string")]],
+    "action": Value("string"),
+    "rows": Value("int32"),
+    "cols": Value("int32"),
+})
 
 
 class MinesweeperDatasetLoader:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", encoder: Optional[str] = None):
+        """
+        encoder: board encoder for the prompts (see encoders.py); None keeps the stored grid text.
+        """
         self.base_dir: Path = get_base_directory()
         self.data_dir: Path = (self.base_dir / data_dir).resolve()
+        if encoder is not None:
+            get_encoder(encoder)  # fail early on unknown names
+        self.encoder: Optional[str] = encoder
         print(f"Using data directory: {self.data_dir}")
         if not self.data_dir.exists():
             print(f"Data directory does not exist: {self.data_dir}")
         else:
             print(f"Data directory exists: {self.data_dir}")
         self.games = sorted([g for g in self.data_dir.glob("game*") if g.is_dir()])
-        if not self.games:
-            print(f"No game directories found in {self.data_dir}")
+        self.shards = sorted(self.data_dir.glob("shard*.npz"))
+        if not self.games and not self.shards:
+            print(f"No game directories or shards found in {self.data_dir}")
         else:
-            print(f"Found {len(self.games)} game directories in {self.data_dir}")
-
-    def load_examples(self) -> List[MinesweeperExample]:
-        examples: List[MinesweeperExample] = []
-        for game in self.games:
-            step_files = sorted(game.glob("step*.txt"), key=lambda p: int(p.stem[4:]))
-            hidden_state: List[List[str]] = [
-                line.split() for line in (game / "hidden_state.txt").read_text().splitlines() if line.strip()
-            ]
-
-            for i in range(len(step_files) - 1):
-                state_str = step_files[i].read_text()
-                board_state: List[List[str]] = [
-                    line.split() for line in state_str.splitlines() if line.strip()
-                ]
-                # next_state = step_files[i+1].read_text()
-
-                # Find action: difference between states (TODO: store all possible valid actions)
-                # action = self._extract_action(state, next_state)
-                examples.append(MinesweeperExample(input=state_str, board_state=board_state, hidden_state=hidden_state))
-        random.shuffle(examples)
+            print(f"Found {len(self.games)} game directories and {len(self.shards)} shards in {self.data_dir}")
+
+    def load_examples(
+            self,
+            workers: int = 1,
+            seed: Optional[int] = None,
+            shuffle: bool = True,
+            verbose: bool = False,
+        ) -> List[MinesweeperExample]:
+        """
+        Load every example into memory.
+        workers: with more than one, game files are read in a thread pool and parsed in a
+        process pool of this size (see _load_parallel); the result is the same either way.
+        seed: makes the shuffle reproducible (None shuffles differently on every call).
+        shuffle: False keeps source order (games, then shards).
+        verbose: print parsing progress and a throughput summary.
+        """
+        start = time.perf_counter()
+        if workers > 1:
+            examples: List[MinesweeperExample] = self._load_parallel(workers, verbose)
+        else:
+            examples = list(self.iter_examples())
+        elapsed = time.perf_counter() - start
+        if verbose:
+            sources = len(self.games) + len(self.shards)
+            print(f"Loaded {len(examples)} examples from {sources} sources in {elapsed:.2f}s "
+                  f"({sources / max(elapsed, 1e-9):.0f} sources/s, {len(examples) / max(elapsed, 1e-9):.0f} examples/s)")
+
+        if shuffle:
+            random.Random(seed).shuffle(examples)
         return examples
 
-    # def _extract_action(self, prev_state: str, next_state: str) -> str:
-    #     prev_lines = prev_state.splitlines()
-    #     next_lines = next_state.splitlines()
-    #     for r, (pl, nl) in enumerate(zip(prev_lines, next_lines)):
-    #         for c, (pc, nc) in enumerate(zip(pl, nl)):
-    #             if pc != nc:
-    #                 return f"{r} {c}" if nc != "F" else f"{r} {c} f"
-    #     raise ValueError("No difference found between states; every state transition must have a difference.")
+    def iter_examples(self, sources: Optional[List[Path]] = None) -> Iterator[MinesweeperExample]:
+        """
+        Yield examples one game at a time (in source order, unshuffled) without holding the dataset in memory.
+        sources: game directories and/or shard files to read (default: everything found in data_dir).
+        """
+        for source in (self.games + self.shards if sources is None else sources):
+            if source.is_dir():
+                yield from _parse_game(*_read_game(source))
+            else:
+                for record in read_game_shard(source):
+                    yield from _record_examples(record)
+
+    def _load_parallel(self, workers: int, verbose: bool = False) -> List[MinesweeperExample]:
+        """
+        Read game directories in chunks of LOAD_CHUNK_SIZE on a thread pool (small-file reads are
+        latency bound, so many can be in flight) and hand every chunk to a process pool for parsing
+        as soon as it has been read. Shards are read and decoded directly in the process pool.
+        Results are reassembled in source order. Parsing processes are spawned rather than
+        forked, since forking while the I/O threads are running can deadlock the children.
+        """
+        chunks: List[List[Path]] = [
+            self.games[i:i + LOAD_CHUNK_SIZE] for i in range(0, len(self.games), LOAD_CHUNK_SIZE)
+        ]
+        results: List[List[MinesweeperExample]] = [[] for _ in range(len(chunks) + len(self.shards))]
+        total = len(self.games) + len(self.shards)
+        report_every = max(1, total // 10)
+        done = 0
+        next_report = report_every
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers * IO_THREADS_PER_WORKER) as io_pool, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as parse_pool:
+            parsing: Dict[Future, Tuple[int, int]] = {}
+            for i, shard in enumerate(self.shards):
+                parsing[parse_pool.submit(_load_shard, shard)] = (len(chunks) + i, 1)
+            reads = {io_pool.submit(_read_games, chunk): i for i, chunk in enumerate(chunks)}
+            for read in as_completed(reads):
+                i = reads[read]
+                parsing[parse_pool.submit(_parse_games, read.result())] = (i, len(chunks[i]))
+
+            for parsed in as_completed(parsing):
+                i, count = parsing[parsed]
+                results[i] = parsed.result()
+                done += count
+                if verbose and (done >= next_report or done == total):
+                    elapsed = time.perf_counter() - start
+                    print(f"Parsed {done}/{total} sources ({done / max(elapsed, 1e-9):.0f} sources/s)")
+                    next_report = done + report_every
+
+        return [ex for chunk in results for ex in chunk]
 
-    def to_hf_dataset(self) -> Dataset:
+    def to_hf_dataset(
+            self,
+            streaming: bool = False,
+            shuffle_buffer: int = DEFAULT_SHUFFLE_BUFFER,
+            seed: Optional[int] = None,
+            cache: bool = False,
+            workers: int = 1,
+            bucket_batch_size: Optional[int] = None,
+        ) -> Union[Dataset, IterableDataset]:
         """
         Convert Minesweeper examples to a Hugging Face Dataset object
         suitable for GRPO training.
+        With `streaming`, returns an IterableDataset that reads games on the fly and shuffles
+        through a bounded buffer of `shuffle_buffer` rows (source order is shuffled too), so
+        memory stays flat regardless of dataset size.
+        With `cache` (in-memory datasets only), the processed rows are saved unshuffled as Arrow
+        under data_dir/.cache/<key> and memory-mapped from there on later calls (see cache_key());
+        the seeded shuffle is applied after loading, so a cache hit keeps the order of `seed`.
+        workers: parallel loading for in-memory datasets, see load_examples().
+        bucket_batch_size: order the in-memory dataset so that consecutive batches of this many
+        rows share one board size, see bucket_by_size().
         """
-        examples: List[MinesweeperExample] = self.load_examples()
-
-        hf_data: List[Dict[str, Any]] = [
-            {
-                **format_example(ex),
-                "board_state": ex.board_state,
-                "hidden_state": ex.hidden_state,
-            }
-            for ex in examples
-        ]
+        if streaming:
+            if bucket_batch_size is not None:
+                raise ValueError("Bucketing by board size requires an in-memory dataset.")
+            dataset = IterableDataset.from_generator(
+                self._iter_rows,
+                features=ROW_FEATURES,
+                gen_kwargs={"sources": self.games + self.shards},
+            )
+            return dataset.shuffle(seed=seed, buffer_size=shuffle_buffer)
+
+        dataset = self._load_dataset(seed, cache, workers)
+        if bucket_batch_size is not None:
+            dataset = bucket_by_size(dataset, bucket_batch_size, seed)
+        return dataset
+
+    def _load_dataset(self, seed: Optional[int], cache: bool, workers: int) -> Dataset:
+        dataset = self._load_rows(cache, workers)
+        # Same permutation as load_examples(seed=seed) applies to the examples
+        order = list(range(len(dataset)))
+        random.Random(seed).shuffle(order)
+        return dataset.select(order)
+
+    def _load_rows(self, cache: bool, workers: int) -> Dataset:
+        """
+        Every row in source order, from the cache when it is current.
+        """
+        if cache:
+            cache_root = self.data_dir / CACHE_DIR_NAME
+            cache_path = cache_root / self.cache_key()
+            if cache_path.exists():
+                print(f"Loading cached dataset from {cache_path}")
+                return Dataset.load_from_disk(str(cache_path))
+
+        examples: List[MinesweeperExample] = self.load_examples(workers=workers, shuffle=False)
+
+        hf_data: List[Dict[str, Any]] = [self._to_row(ex) for ex in examples]
+
+        dataset = Dataset.from_list(hf_data, features=ROW_FEATURES)
+        if not cache:
+            return dataset
+
+        # Replace this encoder's stale entries (their sources or prompts changed); other
+        # encoders' caches stay
+        prefix = self._cache_prefix()
+        if cache_root.exists():
+            for entry in cache_root.iterdir():
+                if entry.name.startswith(f"{prefix}-"):
+                    shutil.rmtree(entry)
+        dataset.save_to_disk(str(cache_path))
+        print(f"Saved dataset cache to {cache_path}")
+        return Dataset.load_from_disk(str(cache_path))
+
+    def cache_key(self) -> str:
+        """
+        "<encoder>-<hash>", the hash covering everything the processed rows depend on: the
+        manifest of source files (name, size, modification time) and the prompts as rendered
+        for CACHE_PROBE_EXAMPLE (system prompt and encoded board).
+        """
+        digest = hashlib.sha256()
+        probe_prompt = format_example(CACHE_PROBE_EXAMPLE, self.encoder)["prompt"]
+        digest.update(f"{CACHE_VERSION}\n{json.dumps(probe_prompt)}\n".encode())
+        for source in self.games + self.shards:
+            files = sorted(source.iterdir()) if source.is_dir() else [source]
+            for path in files:
+                stat = path.stat()
+                digest.update(f"{path.relative_to(self.data_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return f"{self._cache_prefix()}-{digest.hexdigest()[:16]}"
+
+    def _cache_prefix(self) -> str:
+        return self.encoder or STORED_INPUT_CACHE_PREFIX
+
+    def _iter_rows(self, sources: List[Path]) -> Iterator[Dict[str, Any]]:
+        for ex in self.iter_examples(sources):
+            yield self._to_row(ex)
+
+    def _to_row(self, ex: MinesweeperExample) -> Dict[str, Any]:
+        return {
+            **format_example(ex, self.encoder),
+            "board_state": ex.board_state,
+            "hidden_state": ex.hidden_state,
+            "action": ex.action,
+            "rows": ex.rows,
+            "cols": ex.cols,
+        }
+
+
+# Raw contents of one game directory: hidden_state.txt and the step files in step order
+GameFiles = Tuple[str, List[str]]
+
+
+def _read_game(game: Path) -> GameFiles:
+    step_files = sorted(game.glob("step*.txt"), key=lambda p: int(p.stem[4:]))
+    return (game / "hidden_state.txt").read_text(), [step.read_text() for step in step_files]
+
+
+def _read_games(games: List[Path]) -> List[GameFiles]:
+    return [_read_game(game) for game in games]
+
+
+def _parse_game(hidden_text: str, step_texts: List[str]) -> List[MinesweeperExample]:
+    """
+    Examples for one game stored as a directory of text files.
+    The action label is the move that leads to the next step, see _extract_action.
+    """
+    hidden_state: List[List[str]] = [line.split() for line in hidden_text.splitlines() if line.strip()]
+    boards: List[List[List[str]]] = [
+        [line.split() for line in state_str.splitlines() if line.strip()] for state_str in step_texts
+    ]
+    return [
+        MinesweeperExample(
+            input=state_str,
+            board_state=board_state,
+            hidden_state=hidden_state,
+            action=_extract_action(board_state, next_state),
+        )
+        for state_str, board_state, next_state in zip(step_texts, boards, boards[1:])
+    ]
+
+
+def _extract_action(board_state: List[List[str]], next_state: List[List[str]]) -> str:
+    """
+    The move between two consecutive boards: the flagged cell, the single revealed cell, or
+    for a flood fill the first revealed 0 in row-major order (revealing any 0 of the flood
+    uncovers the same cells, so it may differ from the solver's own click).
+    """
+    changed = [
+        (r, c, cell)
+        for r, (row, next_row) in enumerate(zip(board_state, next_state))
+        for c, (old, cell) in enumerate(zip(row, next_row))
+        if old != cell
+    ]
+    if not changed:
+        raise ValueError("No difference found between states; every state transition must have a difference.")
+    flags = [(r, c) for r, c, cell in changed if cell == "F"]
+    if flags:
+        return format_move(*flags[0], "flag")
+    r, c, _ = next(((r, c, cell) for r, c, cell in changed if cell == "0"), changed[0])
+    return format_move(r, c, "reveal")
+
+
+def _parse_games(games: List[GameFiles]) -> List[MinesweeperExample]:
+    """
+    Parse a chunk of games; module-level so that it can run in a worker process.
+    """
+    return [ex for hidden_text, step_texts in games for ex in _parse_game(hidden_text, step_texts)]
+
+
+def _record_examples(record: GameRecord) -> Iterator[MinesweeperExample]:
+    """
+    Examples for one game read from a shard, expanded lazily one step at a time.
+    Boards match the ones built from the game's text files; the action label is the next solver move.
+    """
+    for board_state, next_move in zip(record.iter_steps(), record.moves[1:]):
+        yield MinesweeperExample(
+            input=format_board(board_state) + "\n",
+            board_state=board_state,
+            hidden_state=record.hidden_state,
+            action=format_move(next_move.row, next_move.col, next_move.action),
+        )
+
+
+def _load_shard(path: Path) -> List[MinesweeperExample]:
+    return [ex for record in read_game_shard(path) for ex in _record_examples(record)]
+
+
+def bucket_by_size(dataset: Dataset, batch_size: int, seed: Optional[int] = None) -> Dataset:
+    """
+    Reorder rows into batches of `batch_size` rows that share one board size (prompt length
+    grows with rows x cols, so mixed batches pad small boards to the largest one).
+    Full batches come first in a seeded random order, then each size's leftover partial batch.
+    The trainer has to keep the dataset order (no per-row shuffling) for this to hold.
+    """
+    rng = random.Random(seed)
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for i, size in enumerate(zip(dataset["rows"], dataset["cols"])):
+        buckets.setdefault(size, []).append(i)
 
-        return Dataset.from_list(hf_data)
+    full: List[List[int]] = []
+    partial: List[List[int]] = []
+    for size in sorted(buckets):
+        indices = buckets[size]
+        rng.shuffle(indices)
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            (full if len(batch) == batch_size else partial).append(batch)
+    rng.shuffle(full)
+    return dataset.select([i for batch in full + partial for i in batch])
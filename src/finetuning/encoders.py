@@ -0,0 +1,166 @@
+# src/finetuning/encoders.py
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from src.minesweeper.board import format_board, safe_neighborhood
+
+# Encoder names, used by format_example, build_system_prompt and the dataset loader
+GRID_ENCODER = "grid"
+COMPACT_ENCODER = "compact"
+COORDINATE_ENCODER = "coordinates"
+FRONTIER_ENCODER = "frontier"
+
+# Cell value of decoded cells that an encoding does not carry
+UNKNOWN_CELL = "?"
+
+SYMBOL_LEGEND = """- '*' means the tile has not been revealed yet.
+- Numbers 0–8 show how many mines are adjacent to that square.
+- 'F' means the tile has already been flagged as a mine."""
+
+FRONTIER_ENTRY = re.compile(r"\((\d+),(\d+)\)(?:=(\S))?")
+
+
+class BoardEncoder(ABC):
+    """
+    Turns a board (rows of cell symbols) into the user message text and back.
+    `description` is the part of the system prompt that explains the layout.
+    Lossless encoders decode to the exact board; others fill what they drop with UNKNOWN_CELL.
+    Subclasses must implement encode and decode.
+    """
+    name: str = ""
+    description: str = ""
+    lossless: bool = True
+
+    @abstractmethod
+    def encode(self, board: List[List[str]]) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, text: str, rows: int, cols: int) -> List[List[str]]:
+        pass
+
+
+class GridEncoder(BoardEncoder):
+    """
+    Space-separated symbols, one row per line (the print_board layout).
+    """
+    name = GRID_ENCODER
+    description = SYMBOL_LEGEND + "\n- The board will be displayed as a grid of symbols only."
+
+    def encode(self, board: List[List[str]]) -> str:
+        return format_board(board)
+
+    def decode(self, text: str, rows: int, cols: int) -> List[List[str]]:
+        return _check_shape([line.split() for line in text.splitlines() if line.strip()], rows, cols)
+
+
+class CompactEncoder(BoardEncoder):
+    """
+    One row per line with no separators: every cell is a single character, so the
+    spaces of the grid layout only add tokens.
+    """
+    name = COMPACT_ENCODER
+    description = SYMBOL_LEGEND + "\n- Each line is one row, with one symbol per column and no spaces."
+
+    def encode(self, board: List[List[str]]) -> str:
+        return "".join("".join(row) + "\n" for row in board)
+
+    def decode(self, text: str, rows: int, cols: int) -> List[List[str]]:
+        return _check_shape([list(line.strip()) for line in text.splitlines() if line.strip()], rows, cols)
+
+
+class CoordinateEncoder(BoardEncoder):
+    """
+    Compact rows prefixed with their 1-indexed row number, so the model does not have to
+    count lines to name a row.
+    """
+    name = COORDINATE_ENCODER
+    description = SYMBOL_LEGEND + (
+        "\n- Each line is one row: the row number, a colon, then one symbol per column (column 1 first) with no spaces."
+    )
+
+    def encode(self, board: List[List[str]]) -> str:
+        return "".join(f"{r + 1}: {''.join(row)}\n" for r, row in enumerate(board))
+
+    def decode(self, text: str, rows: int, cols: int) -> List[List[str]]:
+        board = [[UNKNOWN_CELL] * cols for _ in range(rows)]
+        seen = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            label, cells = line.split(":", 1)
+            board[int(label) - 1] = list(cells.strip())
+            seen += 1
+        if seen != rows:
+            raise ValueError(f"Expected {rows} rows, got {seen}")
+        return _check_shape(board, rows, cols)
+
+
+class FrontierEncoder(BoardEncoder):
+    """
+    Sparse listing of the frontier only: revealed numbers that touch an unrevealed cell,
+    flags, and the unrevealed cells next to a number. Its size depends on the frontier
+    length rather than rows x cols. Lossy: interior revealed cells and unrevealed cells
+    away from the numbers are not listed and decode as UNKNOWN_CELL.
+    """
+    name = FRONTIER_ENCODER
+    lossless = False
+    description = SYMBOL_LEGEND + (
+        "\n- The board is listed sparsely as (row,col) entries: numbers that touch an unrevealed cell,"
+        "\n  flagged cells, and the unrevealed cells next to a number. Unlisted cells are either"
+        "\n  unrevealed or revealed with no unrevealed neighbors."
+    )
+
+    def encode(self, board: List[List[str]]) -> str:
+        rows, cols = len(board), len(board[0])
+        numbers, flags, candidates = [], [], []
+        # Flags are listed on their own line, so they are not counted as unrevealed
+        unrevealed = sum(cell == "*" for row in board for cell in row)
+        for r in range(rows):
+            for c in range(cols):
+                cell = board[r][c]
+                neighbors = [board[nr][nc] for nr, nc in safe_neighborhood(rows, cols, r, c) if (nr, nc) != (r, c)]
+                if cell == "F":
+                    flags.append(f"({r + 1},{c + 1})")
+                elif cell == "*":
+                    if any(n.isdigit() for n in neighbors):
+                        candidates.append(f"({r + 1},{c + 1})")
+                elif cell.isdigit() and any(n in ("*", "F") for n in neighbors):
+                    numbers.append(f"({r + 1},{c + 1})={cell}")
+        return (
+            f"size: {rows}x{cols}\n"
+            f"unrevealed: {unrevealed}\n"
+            f"numbers: {' '.join(numbers)}\n"
+            f"flags: {' '.join(flags)}\n"
+            f"candidates: {' '.join(candidates)}\n"
+        )
+
+    def decode(self, text: str, rows: int, cols: int) -> List[List[str]]:
+        board = [[UNKNOWN_CELL] * cols for _ in range(rows)]
+        for line in text.splitlines():
+            key, _, entries = line.partition(":")
+            symbol = {"flags": "F", "candidates": "*"}.get(key.strip())
+            if key.strip() != "numbers" and symbol is None:
+                continue
+            for row, col, value in FRONTIER_ENTRY.findall(entries):
+                board[int(row) - 1][int(col) - 1] = value or symbol
+        return board
+
+
+ENCODERS: Dict[str, BoardEncoder] = {
+    encoder.name: encoder
+    for encoder in (GridEncoder(), CompactEncoder(), CoordinateEncoder(), FrontierEncoder())
+}
+
+
+def get_encoder(name: str) -> BoardEncoder:
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown board encoder: {name} (expected one of {', '.join(ENCODERS)})")
+    return ENCODERS[name]
+
+
+def _check_shape(board: List[List[str]], rows: int, cols: int) -> List[List[str]]:
+    if len(board) != rows or any(len(row) != cols for row in board):
+        raise ValueError(f"Decoded board does not have the expected {rows}x{cols} shape")
+    return board
@@ -0,0 +1,209 @@
+# src/finetuning/evaluate.py
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from src.finetuning.dataset import MinesweeperDatasetLoader
+from src.finetuning.prompt import PromptTokenizer, format_example
+from src.finetuning.rewards import reward_format_correct, reward_safe_move, score_batch
+from src.models import MinesweeperExample
+
+DEFAULT_MODEL = "unsloth/Qwen3-0.6B"
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_NEW_TOKENS = 32
+
+# A chat prompt as built by format_example: [system message, user message]
+Prompt = List[Dict[str, str]]
+# Batched generation: one completion text per prompt, in order (e.g. HFGenerator)
+GenerateFn = Callable[[List[Prompt]], List[str]]
+
+CORRECT_MOVE_REWARD = 5.0
+
+
+@dataclass
+class GeneratorStats:
+    """
+    Timings of every generate call made by an HFGenerator.
+    """
+    batch_latencies: List[float] = field(default_factory=list)  # seconds per batch
+    prompt_tokens: int = 0
+    generated_tokens: int = 0
+    examples: int = 0
+
+    @property
+    def generate_time(self) -> float:
+        return sum(self.batch_latencies)
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.generated_tokens / self.generate_time if self.generate_time else 0.0
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        if not self.batch_latencies:
+            return {}
+        return {f"p{q}": float(np.percentile(self.batch_latencies, q)) for q in (50, 90, 99)}
+
+
+class HFGenerator:
+    """
+    Batched greedy generation with a Hugging Face causal LM (CPU by default).
+    Called with a list of chat prompts, returns one completion text per prompt (in order).
+    Prompts are sorted by token length and grouped into batches of `batch_size`, so each
+    batch is left-padded only to its own longest prompt.
+    torch and transformers are imported on use, so the scoring code does not need them.
+    """
+
+    def __init__(
+            self,
+            model_name: str = DEFAULT_MODEL,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS,
+            device: str = "cpu",
+        ):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.batch_size: int = batch_size
+        self.max_new_tokens: int = max_new_tokens
+        self.device: str = device
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+        ).to(device)
+        self.model.eval()
+        self.prompt_tokenizer = PromptTokenizer(self.tokenizer, enable_thinking=False)
+        self.pad_token_id: int = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else self.tokenizer.eos_token_id
+        eos = self.model.generation_config.eos_token_id
+        self.eos_token_ids = set(eos if isinstance(eos, list) else [eos])
+        self.stats = GeneratorStats()
+
+    def __call__(self, prompts: List[Prompt]) -> List[str]:
+        prompt_ids = self.prompt_tokenizer.encode_batch(prompts)
+        order = sorted(range(len(prompts)), key=lambda i: len(prompt_ids[i]))
+        outputs: List[str] = [""] * len(prompts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, text in zip(batch, self._generate([prompt_ids[i] for i in batch])):
+                outputs[i] = text
+        return outputs
+
+    def _generate(self, batch_ids: List[List[int]]) -> List[str]:
+        import torch
+
+        width = max(len(ids) for ids in batch_ids)
+        input_ids = torch.full((len(batch_ids), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch_ids), width), dtype=torch.long)
+        for row, ids in enumerate(batch_ids):
+            input_ids[row, width - len(ids):] = torch.tensor(ids)
+            attention_mask[row, width - len(ids):] = 1
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            generated = self.model.generate(
+                input_ids=input_ids.to(self.device),
+                attention_mask=attention_mask.to(self.device),
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+                pad_token_id=self.pad_token_id,
+            )
+        self.stats.batch_latencies.append(time.perf_counter() - start)
+
+        texts = []
+        for row in generated[:, width:].tolist():
+            # Count tokens up to and including the first end-of-sequence token
+            length = next((i + 1 for i, token in enumerate(row) if token in self.eos_token_ids), len(row))
+            self.stats.generated_tokens += length
+            texts.append(self.tokenizer.decode(row[:length], skip_special_tokens=True).strip())
+        self.stats.prompt_tokens += sum(len(ids) for ids in batch_ids)
+        self.stats.examples += len(batch_ids)
+        return texts
+
+
+def score_completions(examples: List[MinesweeperExample], prompts: List[Prompt], texts: List[str]) -> Dict[str, float]:
+    """
+    Mean of every reward component, plus accuracy: the share of moves that earn the
+    full correct-move reward (a logical reveal of a safe cell or flag of a mine).
+    Scores come from score_batch rather than the TRL reward hooks, which print debug output.
+    """
+    completions = [[{"role": "assistant", "content": text}] for text in texts]
+    board_state = [ex.board_state for ex in examples]
+    hidden_state = [ex.hidden_state for ex in examples]
+    scores = score_batch(completions, board_state, hidden_state)
+    return {
+        "mean_format": float(np.mean(reward_format_correct(completions))),
+        "mean_valid_cell": float(np.mean(scores.valid_cell)),
+        "mean_logical_move": float(np.mean(scores.logical_move)),
+        "mean_correct_move": float(np.mean(scores.correct_move)),
+        "mean_safe_move": float(np.mean(reward_safe_move(prompts, completions, board_state, hidden_state))),
+        "accuracy": float(np.mean(scores.correct_move == CORRECT_MOVE_REWARD)),
+    }
+
+
+def evaluate(
+        generate: GenerateFn,
+        data_dir: str = "data/test",
+        limit: Optional[int] = None,
+        encoder: Optional[str] = None,
+    ) -> Dict[str, float]:
+    """
+    Generate a move for every example of data_dir (source order, first `limit` examples)
+    and report reward scores alongside throughput and peak memory. Token rates and batch
+    latencies are added when `generate` keeps GeneratorStats (as HFGenerator does).
+    """
+    examples = MinesweeperDatasetLoader(data_dir, encoder=encoder).load_examples(shuffle=False)
+    if limit is not None:
+        examples = examples[:limit]
+    prompts = [format_example(ex, encoder)["prompt"] for ex in examples]
+
+    start = time.perf_counter()
+    texts = generate(prompts)
+    wall_time = time.perf_counter() - start
+
+    results = score_completions(examples, prompts, texts)
+    results.update({
+        "examples": len(examples),
+        "wall_time_s": wall_time,
+        "examples_per_s": len(examples) / wall_time if wall_time else 0.0,
+    })
+    stats: Optional[GeneratorStats] = getattr(generate, "stats", None)
+    if stats is not None:
+        results.update({
+            "generated_tokens_per_s": stats.tokens_per_second,
+            "prompt_tokens_per_s": stats.prompt_tokens / stats.generate_time if stats.generate_time else 0.0,
+            **{f"batch_latency_{name}_ms": value * 1000 for name, value in stats.latency_percentiles().items()},
+        })
+    # ru_maxrss is in kilobytes on Linux
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate a model's Minesweeper moves on a dataset split.")
+    parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help=f"Model name or path (default: {DEFAULT_MODEL})")
+    parser.add_argument("--data-dir", type=str, default="data/test", help="Dataset directory (default: data/test)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Prompts per generate call (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--max-new-tokens", type=int, default=DEFAULT_MAX_NEW_TOKENS,
+                        help=f"Tokens generated per move (default: {DEFAULT_MAX_NEW_TOKENS})")
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate only the first N examples (default: all)")
+    parser.add_argument("--encoder", type=str, default=None, help="Board encoder for the prompts (default: stored grid text)")
+    parser.add_argument("--device", type=str, default="cpu", help="Torch device (default: cpu)")
+    parser.add_argument("--threads", type=int, default=None, help="Torch CPU threads (default: torch's choice)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import torch
+
+    args = parse_args()
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+    generator = HFGenerator(args.model, batch_size=args.batch_size, max_new_tokens=args.max_new_tokens, device=args.device)
+    results = evaluate(generator, data_dir=args.data_dir, limit=args.limit, encoder=args.encoder)
+    for name, value in results.items():
+        print(f"[INFO] {name}: {value:.4f}" if isinstance(value, float) else f"[INFO] {name}: {value}")
@@ -1,10 +1,14 @@
 # src/finetuning/prompt.py
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
 from src.globals import TRAINING_ROWS, TRAINING_COLS
 from src.models import MinesweeperExample
+from src.finetuning.encoders import GRID_ENCODER, get_encoder
 
 
-SYSTEM_PROMPT = f"""You are a Minesweeper assistant.
-The game board is always {TRAINING_ROWS}x{TRAINING_COLS} in size.
+SYSTEM_PROMPT_TEMPLATE = """You are a Minesweeper assistant.
+The game board is always {rows}x{cols} in size.
 You will be given ONLY the current board state as input from the user.
 
 Your task: Suggest exactly ONE valid next move for the minesweeper board given by the user.
@@ -14,24 +18,103 @@ Move format rules (must follow exactly one of these two):
 2. "row: NUM, col: NUM, action: flag"         → to flag a cell as a mine
 
 Board representation:
-- '*' means the tile has not been revealed yet.
-- Numbers 0–8 show how many mines are adjacent to that square.
-- 'F' means the tile has already been flagged as a mine.
-- The board will be displayed as a grid of symbols only.
+{representation}
 
 Important condition:
 - You may only suggest moves on cells that contain '*'.  
 - Do NOT suggest moves on numbers or flagged tiles, as these have already been revealed or correctly flagged.
 
 Summary:
-- Suggest one valid move next with the format "row: NUM, col: NUM, action: reveal" or "row: NUM, col: NUM, action: flag", where NUM is an integer in the range [1, {TRAINING_ROWS}] for rows and [1, {TRAINING_COLS}] for columns.
+- Suggest one valid move next with the format "row: NUM, col: NUM, action: reveal" or "row: NUM, col: NUM, action: flag", where NUM is an integer in the range [1, {rows}] for rows and [1, {cols}] for columns.
 - Do NOT explain your reasoning or thought process. Only output the valid move.
 """
 
-def format_example(example: MinesweeperExample) -> dict:
+
+@lru_cache(maxsize=None)
+def build_system_prompt(rows: int, cols: int, encoder: str = GRID_ENCODER) -> str:
+    """
+    System prompt for a rows x cols board shown with the given board encoder (see encoders.py).
+    """
+    return SYSTEM_PROMPT_TEMPLATE.format(rows=rows, cols=cols, representation=get_encoder(encoder).description)
+
+
+# Prompt for the default training board size
+SYSTEM_PROMPT = build_system_prompt(TRAINING_ROWS, TRAINING_COLS)
+
+def format_move(row: int, col: int, action: str) -> str:
+    """
+    Format a 0-indexed move the way the model is asked to answer.
+    """
+    return f"row: {row + 1}, col: {col + 1}, action: {action}"
+
+
+def format_example(example: MinesweeperExample, encoder: Optional[str] = None) -> dict:
+    """
+    encoder: re-encode the board with this board encoder; None sends example.input as stored
+    (the grid layout).
+    """
+    content = example.input if encoder is None else get_encoder(encoder).encode(example.board_state)
     return {
         "prompt": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": example.input},
+            {"role": "system", "content": build_system_prompt(example.rows, example.cols, encoder or GRID_ENCODER)},
+            {"role": "user", "content": content},
         ]
     }
+
+
+class PromptTokenizer:
+    """
+    Tokenizes chat prompts of the form [system, user] (as built by format_example)
+    without re-encoding the shared system prompt every time: the chat template is
+    rendered once per distinct system prompt around a placeholder user message, the
+    part before the placeholder is tokenized once and cached, and each call only
+    tokenizes the user message and the template's closing tokens.
+    `tokenizer` is a Hugging Face tokenizer; template_kwargs are passed to
+    apply_chat_template (e.g. enable_thinking=False).
+    """
+    USER_PLACEHOLDER = "<<minesweeper-board>>"
+
+    def __init__(self, tokenizer: Any, **template_kwargs):
+        self.tokenizer = tokenizer
+        self.template_kwargs: Dict[str, Any] = template_kwargs
+        # system prompt -> (prefix token ids, template text after the user message)
+        self._prefixes: Dict[str, Tuple[List[int], str]] = {}
+
+    def encode(self, messages: List[Dict[str, str]]) -> List[int]:
+        system, user = messages
+        if user["content"][:1].isspace():
+            # Leading whitespace could merge with the end of the prefix (e.g. "\n\n"), so the
+            # split tokenization might differ from the full one
+            return self._tokenize(self._render(messages))
+        prefix_ids, suffix = self._prefix(system["content"])
+        return prefix_ids + self._tokenize(user["content"] + suffix)
+
+    def encode_batch(self, prompts: List[List[Dict[str, str]]]) -> List[List[int]]:
+        return [self.encode(messages) for messages in prompts]
+
+    def prefix_length(self, system_prompt: str) -> int:
+        """
+        Number of tokens shared by every prompt with this system prompt.
+        """
+        return len(self._prefix(system_prompt)[0])
+
+    def _prefix(self, system_prompt: str) -> Tuple[List[int], str]:
+        if system_prompt not in self._prefixes:
+            text = self._render([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": self.USER_PLACEHOLDER},
+            ])
+            prefix, suffix = text.split(self.USER_PLACEHOLDER)
+            self._prefixes[system_prompt] = (self._tokenize(prefix), suffix)
+        return self._prefixes[system_prompt]
+
+    def _render(self, messages: List[Dict[str, str]]) -> str:
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True,
+            **self.template_kwargs,
+        )
+
+    def _tokenize(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
@@ -1,8 +1,13 @@
 # src/finetuning/rewards.py
 import re
-from typing import List, Optional, Tuple, Dict
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Dict
+import numpy as np
 
 from src.globals import TRAINING_ROWS, TRAINING_COLS
+from src.minesweeper.arrayboard import neighbor_counts
+from src.minesweeper.board import Board, format_board
+from src.minesweeper.probability import MineProbability
 
 global PRINTED_TIMES
 PRINTED_TIMES = 0
@@ -10,14 +15,36 @@ global PRINT_EVERY_STEPS
 PRINT_EVERY_STEPS = 5
 
 
-def is_output_valid(move_str: str) -> Optional[Tuple[int, int, str]]:
+# Expected move format, e.g. "row: 2, col: 3, action: reveal" (1-indexed)
+MOVE_PATTERN = re.compile(r"row:\s*(\d+),\s*col:\s*(\d+),\s*action:\s*(reveal|flag)")
+THINK_END_TAG = "</think>"
+
+# reward_safe_move: proven moves get SAFE_MOVE_REWARD, guesses GUESS_REWARD x P(move is right)
+SAFE_MOVE_REWARD = 5.0
+GUESS_REWARD = 2.0
+# Distinct boards whose mine probabilities are kept (a GRPO group shares one board)
+PROBABILITY_CACHE_SIZE = 4096
+
+# (row, col, action) with 0-indexed row/col, or (None, None, None) if the output has no valid move
+ParsedMove = Tuple[Optional[int], Optional[int], Optional[str]]
+
+
+def strip_think(move_str: str) -> str:
+    """
+    Drop a leading reasoning block: everything up to the last </think> tag
+    (the opening tag may be part of the prompt instead of the completion).
+    """
+    return move_str.rsplit(THINK_END_TAG, 1)[-1]
+
+
+def is_output_valid(move_str: str) -> Optional[re.Match]:
     """
     Check if the output move string matches the expected format.
     """
-    return re.match(r"row:\s*(\d+),\s*col:\s*(\d+),\s*action:\s*(reveal|flag)", move_str.strip())
+    return MOVE_PATTERN.match(strip_think(move_str).strip())
 
 
-def parse_move(move_str: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+def parse_move(move_str: str) -> ParsedMove:
     """
     Parse a move string of the format: "row: NUM, col: NUM, action: reveal/flag"
     Returns a tuple: (row, col, action)
@@ -29,11 +56,30 @@ def parse_move(move_str: str) -> Tuple[Optional[int], Optional[int], Optional[st
     return None, None, None
 
 
-def move_square_in_bounds(row: int, col: int) -> bool: # row, col 0-indexed
+# The last parsed batch as (completions, moves); see parse_completions
+_last_parsed: Optional[Tuple[Any, List[ParsedMove]]] = None
+
+
+def parse_completions(completions: List[List[Dict[str, str]]]) -> List[ParsedMove]:
+    """
+    Parse the move of every completion in a batch. TRL calls every reward function
+    with the same completions list, so the result is kept for the last batch
+    (keyed by object identity) and each completion is parsed once per step.
+    """
+    global _last_parsed
+    if _last_parsed is not None and _last_parsed[0] is completions:
+        return _last_parsed[1]
+
+    moves = [parse_move(completion[0]["content"]) for completion in completions]
+    _last_parsed = (completions, moves)
+    return moves
+
+
+def move_square_in_bounds(row: int, col: int, rows: int = TRAINING_ROWS, cols: int = TRAINING_COLS) -> bool: # row, col 0-indexed
     """
     Check if the given row and column are within the board bounds.
     """
-    return 0 <= row < TRAINING_ROWS and 0 <= col < TRAINING_COLS
+    return 0 <= row < rows and 0 <= col < cols
 
 
 
@@ -44,8 +90,7 @@ def reward_format_correct(
     """
     Reward 1: Check if the move follows the correct format.
     """
-    responses = [completion[0]["content"] for completion in completions]
-    return [1.0 if is_output_valid(response) else 0.0 for response in responses]
+    return [0.0 if row is None else 1.0 for row, _, _ in parse_completions(completions)]
 
 
 def reward_valid_cell(
@@ -57,21 +102,7 @@ def reward_valid_cell(
     Reward 2: Reward if the move targets an unrevealed cell ('*').
     board: List of strings representing the current board state.
     """
-    scores = []
-    responses = [completion[0]["content"] for completion in completions]
-    for response, b_state in zip(responses, board_state):
-        row, col, action = parse_move(response)
-        if row is None:
-            scores.append(0.0)
-            continue
-        if not move_square_in_bounds(row, col):
-            scores.append(0.0)
-            continue
-        if b_state[row][col] == '*':
-            scores.append(2.0)
-            continue
-        scores.append(0.0)
-    return scores
+    return score_batch(completions, board_state, kwargs.get("hidden_state")).valid_cell.tolist()
 
 def reward_logical_move(
         prompts: List[List[Dict[str, str]]],
@@ -85,36 +116,7 @@ def reward_logical_move(
     A move is rewarded (score=3) if the chosen square is unrevealed ('*')
     AND at least one of the 8 surrounding squares is revealed (not '*').
     """
-    scores = []
-    responses = [completion[0]["content"] for completion in completions]
-
-    # directions for 8 neighbors
-    neighbors = [(-1, -1), (-1, 0), (-1, 1),
-                 (0, -1),           (0, 1),
-                 (1, -1),  (1, 0),  (1, 1)]
-
-    for response, b_state, h_state in zip(responses, board_state, hidden_state):
-        row, col, action = parse_move(response)
-        if row is None or not move_square_in_bounds(row, col):
-            scores.append(0.0)
-            continue
-
-        # must be unrevealed
-        if b_state[row][col] != '*':
-            scores.append(0.0)
-            continue
-
-        # check surrounding squares
-        logical = 0
-        for dr, dc in neighbors:
-            nr, nc = row + dr, col + dc
-            if move_square_in_bounds(nr, nc):
-                if b_state[nr][nc] != '*':
-                    logical += 1
-
-        scores.append(min(float(logical), 3.0))
-
-    return scores
+    return score_batch(completions, board_state, hidden_state).logical_move.tolist()
 
 def reward_correct_move(
         prompts: List[List[Dict[str, str]]],
@@ -130,53 +132,154 @@ def reward_correct_move(
     
     hidden_state: List of strings representing the ground truth board with mines.
     """
-    scores = []
-    responses = [completion[0]["content"] for completion in completions]
-
     global PRINTED_TIMES
     global PRINT_EVERY_STEPS
     if PRINTED_TIMES % PRINT_EVERY_STEPS == 0:
         print(
             '*'*20 + f" Reward 4 Debugging Info (every {PRINT_EVERY_STEPS} steps) " + '*'*20 + '\n' +
             f"Prompt:\n{prompts[0][-1]['content']}\n" +
-            f"Responses:\n{responses[0]}\n"
+            f"Responses:\n{completions[0][0]['content']}\n"
         )
     PRINTED_TIMES += 1
 
-    # directions for 8 neighbors
-    neighbors = [(-1, -1), (-1, 0), (-1, 1),
-                 (0, -1),           (0, 1),
-                 (1, -1),  (1, 0),  (1, 1)]
+    return score_batch(completions, board_state, hidden_state).correct_move.tolist()
+
 
-    for response, b_state, h_state in zip(responses, board_state, hidden_state):
-        row, col, action = parse_move(response)
-        if row is None or not move_square_in_bounds(row, col):
+def reward_safe_move(
+        prompts: List[List[Dict[str, str]]],
+        completions: List[List[Dict[str, str]]],
+        board_state: List[List[List[str]]],
+        hidden_state: List[List[List[str]]],
+        **kwargs
+    ) -> List[float]:
+    """
+    Reward 5 (alternative to reward 4): Score the move by how safe it is given only the
+    visible board, so lucky guesses earn less than forced deductions.
+    A reveal of a provably safe cell or a flag on a provably mined cell scores SAFE_MOVE_REWARD;
+    any other move on an unrevealed cell scores GUESS_REWARD times the exact probability that
+    it is right (P(safe) for reveals, P(mine) for flags).
+    hidden_state is only used for the total number of mines.
+    """
+    scores = []
+    for (row, col, action), b_state, h_state in zip(parse_completions(completions), board_state, hidden_state):
+        if row is None or not move_square_in_bounds(row, col, len(b_state), len(b_state[0])):
             scores.append(0.0)
             continue
         if b_state[row][col] != '*':
             scores.append(0.0)
             continue
 
-        # Check if move is "logical"
-        logical = False
-        for dr, dc in neighbors:
-            nr, nc = row + dr, col + dc
-            if move_square_in_bounds(nr, nc):
-                neighbor_val = b_state[nr][nc]
-                if neighbor_val.isdigit() or neighbor_val == "F":
-                    logical = True
-                    break
-
-        if not logical:
-            scores.append(0.0)
+        mines = sum(cell == "M" for h_row in h_state for cell in h_row)
+        p_mine = mine_probabilities(format_board(b_state), mines)[row][col]
+        p_right = p_mine if action == "flag" else 1.0 - p_mine
+        scores.append(SAFE_MOVE_REWARD if p_right == 1.0 else GUESS_REWARD * p_right)
+    return scores
+
+
+@lru_cache(maxsize=PROBABILITY_CACHE_SIZE)
+def mine_probabilities(board_text: str, mines: int) -> Tuple[Tuple[float, ...], ...]:
+    """
+    Exact mine probability of every cell of a visible board, given as text (format_board)
+    so that the canonical board and mine count are the cache key.
+    """
+    cells = [line.split() for line in board_text.splitlines() if line.strip()]
+    board = Board(rows=len(cells), cols=len(cells[0]), mines=mines)
+    board.board = cells
+    return tuple(tuple(row) for row in MineProbability(board).probabilities())
+
+
+class BatchScores:
+    """
+    Every reward component for one batch of completions, one array entry per completion.
+    Built by score_batch from the shared parse_completions result: the boards are stacked into
+    NumPy arrays (one stack per board shape) and the neighbor checks run on whole stacks.
+    """
+
+    def __init__(self, size: int):
+        self.valid_cell: np.ndarray = np.zeros(size)
+        self.logical_move: np.ndarray = np.zeros(size)
+        self.correct_move: np.ndarray = np.zeros(size)
+
+
+# The last scored batch as (completions, size, scored with hidden_state, scores). TRL passes every
+# reward function the same completions list but rebuilds the board lists for each one, so the
+# completions object identifies the batch and only the first reward function does the work.
+_last_batch: Optional[Tuple[Any, int, bool, BatchScores]] = None
+
+
+def score_batch(
+        completions: List[List[Dict[str, str]]],
+        board_state: List[List[List[str]]],
+        hidden_state: Optional[List[List[List[str]]]] = None,
+    ) -> BatchScores:
+    """
+    Compute all reward components for a batch, reusing the result when called again
+    with the same completions object as the previous call.
+    Without hidden_state, correct_move is left at 0.
+    Bounds come from each example's board, so a batch may mix board sizes.
+    """
+    global _last_batch
+    if _last_batch is not None:
+        last_completions, size, has_hidden, scores = _last_batch
+        if last_completions is completions and size == len(completions) and (has_hidden or hidden_state is None):
+            return scores
+
+    scores = _compute_batch(completions, board_state, hidden_state)
+    _last_batch = (completions, len(completions), hidden_state is not None, scores)
+    return scores
+
+
+def _compute_batch(
+        completions: List[List[Dict[str, str]]],
+        board_state: List[List[List[str]]],
+        hidden_state: Optional[List[List[List[str]]]],
+    ) -> BatchScores:
+    scores = BatchScores(len(completions))
+
+    # Parse every completion once; group the parsed moves by board shape
+    groups: Dict[Tuple[int, int], List[Tuple[int, int, int, str]]] = {}
+    for i, (row, col, action) in enumerate(parse_completions(completions)):
+        if row is None:
             continue
+        shape = (len(board_state[i]), len(board_state[i][0]))
+        if move_square_in_bounds(row, col, *shape):
+            groups.setdefault(shape, []).append((i, row, col, action))
+
+    for moves in groups.values():
+        index = np.array([i for i, _, _, _ in moves])
+        rows = np.array([row for _, row, _, _ in moves])
+        cols = np.array([col for _, _, col, _ in moves])
+        at = (np.arange(len(moves)), rows, cols)
+
+        boards = _stack_boards([board_state[i] for i in index])
+        unrevealed = boards == ord("*")
+        # Only moves on unrevealed cells score anything
+        target_hidden = unrevealed[at]
+        revealed_neighbors = neighbor_counts(~unrevealed)[at]
+        informative = ((boards >= ord("0")) & (boards <= ord("9"))) | (boards == ord("F"))
+        informative_neighbors = neighbor_counts(informative)[at]
 
+        scores.valid_cell[index] = np.where(target_hidden, 2.0, 0.0)
+        scores.logical_move[index] = np.where(target_hidden, np.minimum(revealed_neighbors, 3), 0.0)
+
+        if hidden_state is None:
+            continue
+        target_mine = np.array([hidden_state[i][row][col] == "M" for i, row, col, _ in moves])
+        actions = np.array([action for _, _, _, action in moves])
+        correct = ((actions == "reveal") & ~target_mine) | ((actions == "flag") & target_mine)
         # Only reward logical AND correct moves
-        if action == "reveal":
-            scores.append(5.0 if h_state[row][col] != 'M' else 0.0)
-        elif action == "flag":
-            scores.append(5.0 if h_state[row][col] == 'M' else 0.0)
-        else:
-            scores.append(0.0)
+        scores.correct_move[index] = np.where(target_hidden & (informative_neighbors > 0) & correct, 5.0, 0.0)
 
     return scores
+
+
+def _stack_boards(boards: List[List[List[str]]]) -> np.ndarray:
+    """
+    Stack same-shape boards into a uint8 array of cell characters, shape (n, rows, cols).
+    Every cell is a single character, so the boards are joined into one byte string.
+    """
+    rows, cols = len(boards[0]), len(boards[0][0])
+    data = "".join(cell for board in boards for row in board for cell in row).encode()
+    if len(data) != len(boards) * rows * cols:
+        raise ValueError("Board cells must be single characters")
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(boards), rows, cols)
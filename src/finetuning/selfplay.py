@@ -0,0 +1,240 @@
+# src/finetuning/selfplay.py
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import argparse
+import time
+
+import numpy as np
+
+from src.finetuning.prompt import format_example
+from src.finetuning.rewards import move_square_in_bounds, parse_move
+from src.globals import TRAINING_ROWS, TRAINING_COLS, TRAINING_MIN_MINES, TRAINING_MAX_MINES
+from src.minesweeper.board import format_board
+from src.minesweeper.validboard import BoardGenerationError, ValidBoard
+from src.models import MinesweeperExample
+
+DEFAULT_CONCURRENCY = 32
+# Consecutive unusable answers (unparsable, out of bounds, or not on a '*' cell) before a game is given up
+MAX_INVALID_MOVES = 3
+
+# Outcomes of a finished game
+GAME_WON = "won"
+GAME_LOST = "lost"
+GAME_STALLED = "stalled"
+GAME_SKIPPED = "skipped"  # no valid board could be built, so the game was never played
+
+# A chat prompt as built by format_example: [system message, user message]
+Prompt = List[Dict[str, str]]
+# Batched generation: one completion text per prompt, in order (e.g. evaluate.HFGenerator)
+GenerateFn = Callable[[List[Prompt]], List[str]]
+
+
+@dataclass
+class SelfPlayStats:
+    games: int = 0
+    results: Dict[str, int] = field(
+        default_factory=lambda: {GAME_WON: 0, GAME_LOST: 0, GAME_STALLED: 0, GAME_SKIPPED: 0}
+    )
+    moves: int = 0  # moves applied to a board
+    invalid_moves: int = 0
+    turn_latencies: List[float] = field(default_factory=list)  # seconds per generate call
+    turn_sizes: List[int] = field(default_factory=list)  # games in each generate call
+    wall_time: float = 0.0
+
+    @property
+    def played(self) -> int:
+        return self.games - self.results[GAME_SKIPPED]
+
+    @property
+    def win_rate(self) -> float:
+        """
+        Share of played games that were won (skipped games are left out).
+        """
+        return self.results[GAME_WON] / self.played if self.played else 0.0
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.wall_time if self.wall_time else 0.0
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        if not self.turn_latencies:
+            return {}
+        return {f"p{q}": float(np.percentile(self.turn_latencies, q)) for q in (50, 90, 99)}
+
+
+class SelfPlayGame:
+    """
+    One game in flight: a ValidBoard opened with a random first click, played by the model.
+    """
+
+    def __init__(
+            self,
+            game_index: int,
+            seed: np.random.SeedSequence,
+            rows: int = TRAINING_ROWS,
+            cols: int = TRAINING_COLS,
+            min_mines: int = TRAINING_MIN_MINES,
+            max_mines: int = TRAINING_MAX_MINES,
+        ):
+        rng = np.random.default_rng(seed)
+        mines = int(rng.integers(min_mines, max_mines + 1))
+        self.game_index: int = game_index
+        self.valid_board = ValidBoard(rows=rows, cols=cols, mines=mines, rng=rng)
+        self.valid_board.reveal(int(rng.integers(rows)), int(rng.integers(cols)))
+        self.moves: int = 0
+        self.invalid_streak: int = 0
+        self.result: Optional[str] = GAME_WON if self.valid_board.check_win() else None
+
+    def prompt(self, encoder: Optional[str] = None) -> Prompt:
+        board = self.valid_board.board
+        example = MinesweeperExample(
+            input=format_board(board.board) + "\n",
+            board_state=[[str(cell) for cell in row] for row in board.board],
+            hidden_state=[[str(cell) for cell in row] for row in board.hidden_board],
+        )
+        return format_example(example, encoder)["prompt"]
+
+    def apply(self, text: str, max_moves: int) -> bool:
+        """
+        Play the move in a completion. Returns False if the answer was unusable.
+        Sets `result` once the game is won, lost or stalled.
+        """
+        board = self.valid_board.board
+        row, col, action = parse_move(text)
+        if row is None or not move_square_in_bounds(row, col, board.rows, board.cols) or board.board[row][col] != "*":
+            self.invalid_streak += 1
+            if self.invalid_streak >= MAX_INVALID_MOVES:
+                self.result = GAME_STALLED
+            return False
+
+        self.invalid_streak = 0
+        self.moves += 1
+        if action == "flag":
+            self.valid_board.flag(row, col)
+        elif not self.valid_board.reveal(row, col):
+            self.result = GAME_LOST
+            return True
+
+        if self.valid_board.check_win():
+            self.result = GAME_WON
+        elif self.moves >= max_moves:
+            self.result = GAME_STALLED
+        return True
+
+
+def play_games(
+        generate: GenerateFn,
+        num_games: int,
+        rows: int = TRAINING_ROWS,
+        cols: int = TRAINING_COLS,
+        min_mines: int = TRAINING_MIN_MINES,
+        max_mines: int = TRAINING_MAX_MINES,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        seed: Optional[int] = None,
+        encoder: Optional[str] = None,
+        max_moves: Optional[int] = None,
+    ) -> SelfPlayStats:
+    """
+    Play num_games full games with up to `concurrency` of them in flight. Every turn, the
+    boards of all in-flight games go to `generate` as one batch, each answer is applied to
+    its game, finished games are retired and replaced by new ones until all are played.
+    Games are seeded from children of SeedSequence(seed), so boards do not depend on concurrency.
+    max_moves: moves per game before it counts as stalled (default: rows * cols).
+    """
+    max_moves = max_moves if max_moves is not None else rows * cols
+    seeds = np.random.SeedSequence(seed).spawn(num_games)
+    stats = SelfPlayStats()
+    start = time.perf_counter()
+
+    next_game = 0
+    in_flight: List[SelfPlayGame] = []
+    while next_game < num_games or in_flight:
+        # Top up with new games, retiring any that end on their first click
+        while next_game < num_games and len(in_flight) < concurrency:
+            try:
+                game = SelfPlayGame(next_game, seeds[next_game], rows, cols, min_mines, max_mines)
+            except (BoardGenerationError, ValueError) as e:
+                print(f"[ERROR] Skipped game {next_game}: {e}")
+                stats.games += 1
+                stats.results[GAME_SKIPPED] += 1
+                next_game += 1
+                continue
+            next_game += 1
+            if game.result is None:
+                in_flight.append(game)
+            else:
+                _retire(game, stats)
+        if not in_flight:
+            continue
+
+        prompts = [game.prompt(encoder) for game in in_flight]
+        t0 = time.perf_counter()
+        texts = generate(prompts)
+        stats.turn_latencies.append(time.perf_counter() - t0)
+        stats.turn_sizes.append(len(prompts))
+
+        for game, text in zip(in_flight, texts):
+            if game.apply(text, max_moves):
+                stats.moves += 1
+            else:
+                stats.invalid_moves += 1
+            if game.result is not None:
+                _retire(game, stats)
+        in_flight = [game for game in in_flight if game.result is None]
+
+    stats.wall_time = time.perf_counter() - start
+    return stats
+
+
+def _retire(game: SelfPlayGame, stats: SelfPlayStats) -> None:
+    stats.games += 1
+    stats.results[game.result] += 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Let a model play full Minesweeper games, batched across games.")
+    parser.add_argument("--model", type=str, default=None, help="Model name or path (default: evaluate.DEFAULT_MODEL)")
+    parser.add_argument("--games", type=int, default=100, help="Number of games to play (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Games in flight per turn (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible boards (default: random)")
+    parser.add_argument("--rows", type=int, default=TRAINING_ROWS, help=f"Board rows (default: {TRAINING_ROWS})")
+    parser.add_argument("--cols", type=int, default=TRAINING_COLS, help=f"Board columns (default: {TRAINING_COLS})")
+    parser.add_argument("--min-mines", type=int, default=TRAINING_MIN_MINES,
+                        help=f"Fewest mines per board (default: {TRAINING_MIN_MINES})")
+    parser.add_argument("--max-mines", type=int, default=TRAINING_MAX_MINES,
+                        help=f"Most mines per board (default: {TRAINING_MAX_MINES})")
+    parser.add_argument("--encoder", type=str, default=None, help="Board encoder for the prompts (default: grid text)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Prompts per generate call (default: --concurrency)")
+    parser.add_argument("--max-new-tokens", type=int, default=32, help="Tokens generated per move (default: 32)")
+    parser.add_argument("--device", type=str, default="cpu", help="Torch device (default: cpu)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    # Imported here so that the engine itself does not need torch/transformers
+    from src.finetuning.evaluate import DEFAULT_MODEL, HFGenerator
+
+    args = parse_args()
+    generator = HFGenerator(
+        args.model or DEFAULT_MODEL,
+        batch_size=args.batch_size or args.concurrency,
+        max_new_tokens=args.max_new_tokens,
+        device=args.device,
+    )
+    stats = play_games(
+        generator,
+        num_games=args.games,
+        rows=args.rows,
+        cols=args.cols,
+        min_mines=args.min_mines,
+        max_mines=args.max_mines,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        encoder=args.encoder,
+    )
+    print(f"[INFO] Played {stats.games} games in {stats.wall_time:.2f}s: {stats.results}, win rate {stats.win_rate:.1%}")
+    print(f"[INFO] {stats.moves} moves ({stats.moves_per_second:.1f} moves/s), {stats.invalid_moves} unusable answers")
+    latencies = ", ".join(f"{name} {value * 1000:.1f} ms" for name, value in stats.latency_percentiles().items())
+    print(f"[INFO] Per-turn latency over {len(stats.turn_latencies)} turns "
+          f"(mean batch {np.mean(stats.turn_sizes or [0]):.1f} games): {latencies}")
@@ -0,0 +1,171 @@
+# src/minesweeper/arrayboard.py
+from __future__ import annotations
+from enum import IntEnum
+from typing import Optional, Tuple
+import numpy as np
+
+from src.minesweeper.board import Board, safe_neighborhood
+
+# Value stored in the hidden grid for a mine (numbers 0-8 are stored as-is)
+MINE: int = -1
+
+
+class CellState(IntEnum):
+    HIDDEN = 0
+    REVEALED = 1
+    FLAGGED = 2
+
+
+def neighbor_counts(mines: np.ndarray) -> np.ndarray:
+    """
+    Count adjacent mines for every cell with a single shifted sum.
+    `mines` is a boolean array of shape (..., rows, cols), so a whole stack of
+    boards can be processed at once. Returns an int8 array of the same shape.
+    """
+    rows, cols = mines.shape[-2:]
+    pad = [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mines.astype(np.int8), pad)
+    counts = np.zeros(mines.shape, dtype=np.int8)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            counts += padded[..., dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+def dilate(mask: np.ndarray) -> np.ndarray:
+    """
+    Grow a boolean mask of shape (..., rows, cols) by one cell in all 8 directions.
+    """
+    rows, cols = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad)
+    grown = np.zeros(mask.shape, dtype=bool)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            grown |= padded[..., dr:dr + rows, dc:dc + cols]
+    return grown
+
+
+class ArrayBoard:
+    """
+    NumPy-backed alternative to Board with the same reveal/flag/check_win API.
+    `hidden` is an int8 grid of neighbor counts (MINE for mines) and `state`
+    is a uint8 grid of CellState values.
+    """
+
+    def __init__(self, rows: int = 8, cols: int = 8, mines: int = 10, rng: Optional[np.random.Generator] = None):
+        if mines >= rows * cols:
+            raise ValueError("Number of mines must be less than total board spaces to allow at least one empty square.")
+        self.rows: int = rows
+        self.cols: int = cols
+        self.mines: int = mines
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self.reset_board()
+
+    def reset_board(self):
+        self.hidden: np.ndarray = np.zeros((self.rows, self.cols), dtype=np.int8)
+        self.state: np.ndarray = np.full((self.rows, self.cols), CellState.HIDDEN, dtype=np.uint8)
+
+    def generate_random_board(self, safe_cell: Optional[Tuple[int, int]] = None):
+        """
+        Place mines uniformly at random. If `safe_cell` is given, mines are only sampled
+        outside its 3x3 neighborhood, so revealing it is guaranteed to uncover a 0.
+        """
+        self.reset_board()
+        allowed = np.ones((self.rows, self.cols), dtype=bool)
+        if safe_cell is not None:
+            for r, c in safe_neighborhood(self.rows, self.cols, *safe_cell):
+                allowed[r, c] = False
+            if self.mines > np.count_nonzero(allowed):
+                raise ValueError("Number of mines must fit outside the 3x3 neighborhood of the safe cell.")
+        positions = self.rng.choice(np.flatnonzero(allowed), size=self.mines, replace=False)
+        mine_mask = np.zeros(self.rows * self.cols, dtype=bool)
+        mine_mask[positions] = True
+        self.set_mines(mine_mask.reshape(self.rows, self.cols))
+
+    def set_mines(self, mine_mask: np.ndarray):
+        """
+        Fill the hidden grid from a boolean (rows, cols) mine mask.
+        """
+        self.hidden = neighbor_counts(mine_mask)
+        self.hidden[mine_mask] = MINE
+
+    def reveal(self, r: int, c: int) -> bool:
+        """
+        Reveal a cell. Returns False if a mine is hit, True otherwise.
+        """
+        if self.state[r, c] != CellState.HIDDEN:
+            return True  # already revealed or flagged
+
+        if self.hidden[r, c] == MINE:
+            self.state[r, c] = CellState.REVEALED
+            return False  # Mine hit, game over
+
+        if self.hidden[r, c] != 0:
+            self.state[r, c] = CellState.REVEALED
+            return True
+
+        # Grow the zero region through hidden zeros, then reveal its hidden border
+        hidden = self.state == CellState.HIDDEN
+        passable = hidden & (self.hidden == 0)
+        region = np.zeros_like(passable)
+        region[r, c] = True
+        while True:
+            grown = dilate(region) & passable
+            if np.array_equal(grown, region):
+                break
+            region = grown
+        self.state[dilate(region) & hidden] = CellState.REVEALED
+        return True
+
+    def flag(self, r: int, c: int) -> None:
+        if self.state[r, c] == CellState.HIDDEN:
+            self.state[r, c] = CellState.FLAGGED
+        elif self.state[r, c] == CellState.FLAGGED:
+            self.state[r, c] = CellState.HIDDEN
+
+    def check_win(self) -> bool:
+        return int(np.count_nonzero(self.state != CellState.REVEALED)) == self.mines
+
+    def to_board(self) -> Board:
+        """
+        Convert to a list-backed Board (e.g. to hand it to MinesweeperSolver).
+        """
+        hidden_data = [["M" if v == MINE else int(v) for v in row] for row in self.hidden.tolist()]
+        board_data = [
+            [
+                "*" if s == CellState.HIDDEN else "F" if s == CellState.FLAGGED else str(h)
+                for s, h in zip(state_row, hidden_row)
+            ]
+            for state_row, hidden_row in zip(self.state.tolist(), hidden_data)
+        ]
+        return Board(rows=self.rows, cols=self.cols, mines=self.mines, board_data=board_data, hidden_data=hidden_data)
+
+    @classmethod
+    def from_hidden(cls, hidden: np.ndarray, mines: int, rng: Optional[np.random.Generator] = None) -> ArrayBoard:
+        """
+        Build a fully hidden board from an existing hidden grid (e.g. one slice of a generated batch).
+        """
+        rows, cols = hidden.shape
+        array_board = cls(rows, cols, mines, rng=rng)
+        array_board.hidden = hidden.astype(np.int8, copy=True)
+        return array_board
+
+    @classmethod
+    def from_board(cls, board: Board, rng: Optional[np.random.Generator] = None) -> ArrayBoard:
+        array_board = cls(board.rows, board.cols, board.mines, rng=rng)
+        mine_mask = np.array([[cell == "M" for cell in row] for row in board.hidden_board], dtype=bool)
+        array_board.set_mines(mine_mask)
+        array_board.state = np.array(
+            [
+                [CellState.HIDDEN if cell == "*" else CellState.FLAGGED if cell == "F" else CellState.REVEALED for cell in row]
+                for row in board.board
+            ],
+            dtype=np.uint8,
+        )
+        return array_board
+
+    def print_board(self, reveal_hidden: bool = False):
+        self.to_board().print_board(reveal_hidden)
@@ -0,0 +1,80 @@
+# src/minesweeper/batchgenerator.py
+from typing import List, Optional, Tuple
+import numpy as np
+
+from src.minesweeper.board import Board, safe_neighborhood
+from src.minesweeper.arrayboard import ArrayBoard, MINE, neighbor_counts
+from src.minesweeper.minesweepersolver import MinesweeperSolver
+
+DEFAULT_BATCH_SIZE = 1024
+
+
+def generate_candidate_boards(
+        n: int,
+        rows: int,
+        cols: int,
+        mines: int,
+        rng: np.random.Generator,
+        safe_cell: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+    """
+    Generate `n` random hidden boards at once.
+    Returns an int8 tensor of shape (n, rows, cols) holding neighbor counts, with MINE for mines.
+    If `safe_cell` is given, no mine is placed in its 3x3 neighborhood.
+    """
+    # The `mines` smallest of n independent random keys per board give a uniform placement
+    keys = rng.random((n, rows * cols))
+    if safe_cell is not None:
+        excluded = [r * cols + c for r, c in safe_neighborhood(rows, cols, *safe_cell)]
+        if mines > rows * cols - len(excluded):
+            raise ValueError("Number of mines must fit outside the 3x3 neighborhood of the safe cell.")
+        keys[:, excluded] = np.inf
+    positions = np.argpartition(keys, mines, axis=1)[:, :mines]
+    mine_mask = np.zeros((n, rows * cols), dtype=bool)
+    np.put_along_axis(mine_mask, positions, True, axis=1)
+    mine_mask = mine_mask.reshape(n, rows, cols)
+
+    hidden = neighbor_counts(mine_mask)
+    hidden[mine_mask] = MINE
+    return hidden
+
+
+def generate_valid_boards(
+        n: int,
+        rows: int,
+        cols: int,
+        mines: int,
+        first_click: Tuple[int, int],
+        rng: Optional[np.random.Generator] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        safe_first_click: bool = False,
+    ) -> List[Board]:
+    """
+    Generate `n` boards where the first click reveals a 0 and the rest is solvable without guessing.
+    Candidates are produced `batch_size` at a time and the "first click is a 0" condition is
+    filtered on the whole tensor before any solver work (with `safe_first_click` it holds by
+    construction). Returned boards have the first click already revealed, like ValidBoard.board
+    after its first move.
+    """
+    if mines >= rows * cols:
+        raise ValueError("Number of mines must be less than total board spaces to allow at least one empty square.")
+    rng = rng if rng is not None else np.random.default_rng()
+    r, c = first_click
+    safe_cell = (r, c) if safe_first_click else None
+
+    boards: List[Board] = []
+    while len(boards) < n:
+        hidden = generate_candidate_boards(batch_size, rows, cols, mines, rng, safe_cell=safe_cell)
+        survivors = hidden[hidden[:, r, c] == 0]
+
+        for grid in survivors:
+            board = ArrayBoard.from_hidden(grid, mines, rng=rng)
+            board.reveal(r, c)
+
+            solver = MinesweeperSolver(board.to_board())
+            if solver.is_solvable():
+                boards.append(board.to_board())
+                if len(boards) == n:
+                    break
+
+    return boards
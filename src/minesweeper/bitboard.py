@@ -0,0 +1,233 @@
+# src/minesweeper/bitboard.py
+from __future__ import annotations
+from functools import lru_cache
+from typing import List, Tuple
+
+from src.minesweeper.board import Board, format_board
+
+
+@lru_cache(maxsize=None)
+def neighbor_masks(rows: int, cols: int) -> Tuple[int, ...]:
+    """
+    Bitmask of the (up to 8) neighbors of every cell, indexed by r * cols + c.
+    """
+    masks = []
+    for r in range(rows):
+        for c in range(cols):
+            mask = 0
+            for nr in range(max(0, r - 1), min(rows, r + 2)):
+                for nc in range(max(0, c - 1), min(cols, c + 2)):
+                    if (nr, nc) != (r, c):
+                        mask |= 1 << (nr * cols + nc)
+            masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def shift_masks(rows: int, cols: int) -> Tuple[int, int, int]:
+    """
+    (all cells, all but the first column, all but the last column) for shift-based dilation.
+    """
+    full = (1 << (rows * cols)) - 1
+    first_col = sum(1 << (r * cols) for r in range(rows))
+    last_col = first_col << (cols - 1)
+    return full, full & ~first_col, full & ~last_col
+
+
+def dilate(mask: int, rows: int, cols: int) -> int:
+    """
+    Grow a cell bitmask by one cell in all 8 directions (the mask itself included).
+    """
+    full, not_first_col, not_last_col = shift_masks(rows, cols)
+    # Shifting left by one moves cells to the next column, so drop what wrapped into column 0
+    grown = mask | ((mask << 1) & not_first_col) | ((mask >> 1) & not_last_col)
+    return (grown | (grown << cols) | (grown >> cols)) & full
+
+
+class BitBoard:
+    """
+    Compact board: three Python-int bitmasks (mines, revealed cells, flagged cells) with
+    bit r * cols + c for cell (r, c). Neighbor counts and the mine total are derived on
+    demand, so a board is five slots regardless of its size. Converts losslessly to and
+    from Board, the list form of MinesweeperExample and the text format of the step files.
+    """
+    __slots__ = ("rows", "cols", "mine_mask", "revealed_mask", "flag_mask")
+
+    def __init__(self, rows: int, cols: int, mine_mask: int = 0, revealed_mask: int = 0, flag_mask: int = 0):
+        self.rows: int = rows
+        self.cols: int = cols
+        self.mine_mask: int = mine_mask
+        self.revealed_mask: int = revealed_mask
+        self.flag_mask: int = flag_mask
+
+    @property
+    def mines(self) -> int:
+        return self.mine_mask.bit_count()
+
+    def is_mine(self, r: int, c: int) -> bool:
+        return bool(self.mine_mask >> (r * self.cols + c) & 1)
+
+    def count(self, r: int, c: int) -> int:
+        """
+        Number of mines adjacent to (r, c).
+        """
+        return (self.mine_mask & neighbor_masks(self.rows, self.cols)[r * self.cols + c]).bit_count()
+
+    def hidden_value(self, r: int, c: int):
+        """
+        Ground-truth cell as in Board.hidden_board: "M" or the neighbor count.
+        """
+        return "M" if self.is_mine(r, c) else self.count(r, c)
+
+    def cell(self, r: int, c: int) -> str:
+        """
+        Visible cell as in Board.board: "*", "F", "M" (revealed mine) or the revealed count.
+        """
+        bit = 1 << (r * self.cols + c)
+        if self.revealed_mask & bit:
+            return str(self.hidden_value(r, c))
+        return "F" if self.flag_mask & bit else "*"
+
+    def zero_mask(self) -> int:
+        """
+        Safe cells with no adjacent mines.
+        """
+        full, _, _ = shift_masks(self.rows, self.cols)
+        return full & ~dilate(self.mine_mask, self.rows, self.cols)
+
+    def hidden_mask(self) -> int:
+        """
+        Cells that are neither revealed nor flagged.
+        """
+        full, _, _ = shift_masks(self.rows, self.cols)
+        return full & ~self.revealed_mask & ~self.flag_mask
+
+    def reveal(self, r: int, c: int) -> bool:
+        """
+        Reveal a cell. Returns False if a mine is hit, True otherwise.
+        Same semantics as Board.reveal: flagged and revealed cells are left alone and
+        stop the flood fill, which only spreads through hidden zeros.
+        """
+        if not self.reveal_mask(r, c):
+            return True  # already revealed or flagged
+        return not self.is_mine(r, c)
+
+    def reveal_mask(self, r: int, c: int) -> int:
+        """
+        Reveal a cell (flood-filling 0s) and return the bitmask of the cells revealed by this call.
+        The zero region is grown by dilation restricted to hidden zeros, then its hidden
+        border is revealed along with it.
+        """
+        bit = 1 << (r * self.cols + c)
+        hidden = self.hidden_mask()
+        if not hidden & bit:
+            return 0  # already revealed or flagged
+
+        passable = hidden & self.zero_mask()
+        if not passable & bit:
+            # A mine or a number: only this cell
+            self.revealed_mask |= bit
+            return bit
+
+        region = bit
+        while True:
+            grown = dilate(region, self.rows, self.cols) & passable
+            if grown == region:
+                break
+            region = grown
+        revealed = dilate(region, self.rows, self.cols) & hidden
+        self.revealed_mask |= revealed
+        return revealed
+
+    def cells(self, mask: int) -> List[Tuple[int, int]]:
+        """
+        (r, c) of every set bit of a cell mask, in row-major order.
+        """
+        cells = []
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            cells.append(divmod(index, self.cols))
+            mask ^= low
+        return cells
+
+    def flag(self, r: int, c: int) -> None:
+        bit = 1 << (r * self.cols + c)
+        if not self.revealed_mask & bit:
+            self.flag_mask ^= bit
+
+    def check_win(self) -> bool:
+        return self.rows * self.cols - self.revealed_mask.bit_count() == self.mines
+
+    def key(self) -> Tuple[int, int, int, int, int]:
+        return self.rows, self.cols, self.mine_mask, self.revealed_mask, self.flag_mask
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BitBoard) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"BitBoard({self.rows}x{self.cols}, mines={self.mines}, revealed={self.revealed_mask.bit_count()})"
+
+    def to_lists(self) -> Tuple[List[List[str]], List[List[str]]]:
+        """
+        (board_state, hidden_state) as string grids, the form used by MinesweeperExample.
+        """
+        board_state = [[self.cell(r, c) for c in range(self.cols)] for r in range(self.rows)]
+        hidden_state = [[str(self.hidden_value(r, c)) for c in range(self.cols)] for r in range(self.rows)]
+        return board_state, hidden_state
+
+    @classmethod
+    def from_lists(cls, board_state: List[List], hidden_state: List[List]) -> BitBoard:
+        """
+        Build from a visible grid ("*", "F", revealed values) and its hidden grid ("M" or counts).
+        Raises ValueError if a revealed cell or a count does not match the mines.
+        """
+        rows, cols = len(hidden_state), len(hidden_state[0])
+        bitboard = cls(rows, cols)
+        for r in range(rows):
+            for c in range(cols):
+                bit = 1 << (r * cols + c)
+                if str(hidden_state[r][c]) == "M":
+                    bitboard.mine_mask |= bit
+                visible = str(board_state[r][c])
+                if visible == "F":
+                    bitboard.flag_mask |= bit
+                elif visible != "*":
+                    bitboard.revealed_mask |= bit
+
+        # The masks only carry the mines, so every number has to be consistent with them
+        for r in range(rows):
+            for c in range(cols):
+                if str(hidden_state[r][c]) != str(bitboard.hidden_value(r, c)):
+                    raise ValueError(f"Hidden cell ({r}, {c}) = {hidden_state[r][c]} does not match the mines around it")
+                if bitboard.revealed_mask >> (r * cols + c) & 1 and str(board_state[r][c]) != str(hidden_state[r][c]):
+                    raise ValueError(f"Revealed cell ({r}, {c}) = {board_state[r][c]} does not match the hidden board")
+        return bitboard
+
+    def to_board(self) -> Board:
+        board_state, _ = self.to_lists()
+        hidden_data = [[self.hidden_value(r, c) for c in range(self.cols)] for r in range(self.rows)]
+        return Board(rows=self.rows, cols=self.cols, mines=self.mines, board_data=board_state, hidden_data=hidden_data)
+
+    @classmethod
+    def from_board(cls, board: Board) -> BitBoard:
+        return cls.from_lists(board.board, board.hidden_board)
+
+    def to_text(self, reveal_hidden: bool = False) -> str:
+        board_state, hidden_state = self.to_lists()
+        return format_board(hidden_state if reveal_hidden else board_state)
+
+    @classmethod
+    def from_text(cls, board_text: str, hidden_text: str) -> BitBoard:
+        """
+        Build from the text of a step file (visible board) and of hidden_state.txt.
+        """
+        def parse(text: str) -> List[List[str]]:
+            return [line.split() for line in text.splitlines() if line.strip()]
+        return cls.from_lists(parse(board_text), parse(hidden_text))
+
+    def print_board(self, reveal_hidden: bool = False):
+        print(self.to_text(reveal_hidden))
@@ -1,6 +1,46 @@
 # src/minesweeper/board.py
 import random
 from collections import deque
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+def safe_neighborhood(rows: int, cols: int, r: int, c: int) -> List[Tuple[int, int]]:
+    """
+    Returns the in-bounds cells of the 3x3 neighborhood around (r, c), including (r, c).
+    """
+    return [
+        (nr, nc)
+        for nr in range(max(0, r - 1), min(rows, r + 2))
+        for nc in range(max(0, c - 1), min(cols, c + 2))
+    ]
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(rows: int, cols: int) -> List[List[List[Tuple[int, int]]]]:
+    """
+    Returns the in-bounds neighbor coordinates of every cell. Neighbors only depend on the
+    board shape, so the table is built once per shape and shared (it must not be mutated).
+    """
+    return [
+        [
+            [
+                (nr, nc)
+                for nr in range(max(0, r - 1), min(rows, r + 2))
+                for nc in range(max(0, c - 1), min(cols, c + 2))
+                if (nr, nc) != (r, c)
+            ]
+            for c in range(cols)
+        ]
+        for r in range(rows)
+    ]
+
+
+def format_board(board_data: List[List]) -> str:
+    """
+    Render a grid as text, one space-separated row per line.
+    """
+    return "".join(" ".join(str(cell) for cell in row) + "\n" for row in board_data)
+
 
 class Board:
     def __init__(self, rows: int = 8, cols: int = 8, mines: int = 10, board_data=None, hidden_data=None):
@@ -19,15 +59,26 @@ class Board:
         self.board = [["*" for _ in range(self.cols)] for _ in range(self.rows)]
         self.hidden_board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
 
-    def generate_random_board(self):
+    def generate_random_board(self, safe_cell: Optional[Tuple[int, int]] = None):
+        """
+        Place mines uniformly at random. If `safe_cell` is given, mines are only sampled
+        outside its 3x3 neighborhood, so revealing it is guaranteed to uncover a 0.
+        """
         self.reset_board()
 
         # Place mines randomly
-        positions = set()
-        while len(positions) < self.mines:
-            r = random.randint(0, self.rows - 1)
-            c = random.randint(0, self.cols - 1)
-            positions.add((r, c))
+        if safe_cell is not None:
+            excluded = set(safe_neighborhood(self.rows, self.cols, *safe_cell))
+            candidates = [(r, c) for r in range(self.rows) for c in range(self.cols) if (r, c) not in excluded]
+            if self.mines > len(candidates):
+                raise ValueError("Number of mines must fit outside the 3x3 neighborhood of the safe cell.")
+            positions = random.sample(candidates, self.mines)
+        else:
+            positions = set()
+            while len(positions) < self.mines:
+                r = random.randint(0, self.rows - 1)
+                c = random.randint(0, self.cols - 1)
+                positions.add((r, c))
         for r, c in positions:
             self.hidden_board[r][c] = "M"
 
@@ -54,30 +105,39 @@ class Board:
         if self.board[r][c] != "*":
             return True  # already revealed
 
-        if self.hidden_board[r][c] == "M":
-            self.board[r][c] = "M"
-            return False  # Mine hit, game over
+        self.reveal_cells(r, c)
+        return self.hidden_board[r][c] != "M"  # Mine hit, game over
 
-        # Flood-fill with BFS for 0s
+    def reveal_cells(self, r: int, c: int) -> List[Tuple[int, int]]:
+        """
+        Reveal a cell (flood-filling 0s) and return every cell that was revealed by this call.
+        """
+        if self.board[r][c] != "*":
+            return []  # already revealed
+
+        # A mine or a number uncovers only this cell
+        val = self.hidden_board[r][c]
+        self.board[r][c] = str(val)
+        if val != 0:
+            return [(r, c)]
+
+        # Flood-fill with BFS for 0s. Cells are revealed when queued, so each one is pushed
+        # once; the reveal order is the same as revealing on pop with duplicates skipped.
+        revealed: List[Tuple[int, int]] = [(r, c)]
+        board, hidden_board = self.board, self.hidden_board
+        neighbors = neighbor_table(self.rows, self.cols)
         queue = deque([(r, c)])
         while queue:
             cr, cc = queue.popleft()
-            if self.board[cr][cc] != "*":
-                continue  # already revealed
-
-            val = self.hidden_board[cr][cc]
-            self.board[cr][cc] = str(val)
-
-            if val == 0:
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if dr == 0 and dc == 0:
-                            continue
-                        nr, nc = cr + dr, cc + dc
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            if self.board[nr][nc] == "*":
-                                queue.append((nr, nc))
-        return True
+            for nr, nc in neighbors[cr][cc]:
+                if board[nr][nc] != "*":
+                    continue
+                val = hidden_board[nr][nc]
+                board[nr][nc] = str(val)
+                revealed.append((nr, nc))
+                if val == 0:
+                    queue.append((nr, nc))
+        return revealed
 
     def flag(self, r: int, c: int) -> None:
         if self.board[r][c] == "*":
@@ -89,8 +149,8 @@ class Board:
         unrevealed_or_flagged = sum(cell in ("*", "F") for row in self.board for cell in row)
         return unrevealed_or_flagged == self.mines
 
+    def to_text(self, reveal_hidden: bool = False) -> str:
+        return format_board(self.hidden_board if reveal_hidden else self.board)
+
     def print_board(self, reveal_hidden: bool = False):
-        board_to_print = self.hidden_board if reveal_hidden else self.board
-        for row in board_to_print:
-            print(" ".join(str(cell) for cell in row))
-        print()
+        print(self.to_text(reveal_hidden))
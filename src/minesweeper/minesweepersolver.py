@@ -1,64 +1,314 @@
 # src/minesweeper/solver.py
 from __future__ import annotations
-from typing import List, Tuple
-from src.minesweeper.board import Board
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+from src.minesweeper.board import Board, neighbor_table
+
+# A constraint says that exactly `mines` of the hidden `cells` are mines
+Constraint = Tuple[FrozenSet[Tuple[int, int]], int]
+
+# Frontier components with more hidden cells than this are not enumerated
+MAX_COMPONENT_SIZE = 20
+
+
+class SolverTier(IntEnum):
+    BASIC = 0        # single-cell rules only
+    SUBSET = 1       # + pair-wise overlapping constraint rules
+    ENUMERATION = 2  # + exact enumeration of small frontier components
+
+
+@dataclass
+class SolverStep:
+    row: int
+    col: int
+    action: str  # "reveal" or "flag"
+    revealed: List[Tuple[int, int]] = field(default_factory=list)  # cells uncovered by a reveal
+
+
+StepCallback = Callable[[SolverStep], None]
 
 
 class MinesweeperSolver:
     def __init__(self, board: Board):
         self.board: Board = board
 
-    def is_solvable(self) -> bool:
+        self._neighbors: List[List[List[Tuple[int, int]]]] = neighbor_table(board.rows, board.cols)
+        self._hidden_count: List[List[int]] = []
+        self._flag_count: List[List[int]] = []
+        self._unrevealed: int = 0
+        self._on_step: Optional[StepCallback] = None
+        self._verbose: bool = False
+
+    def is_solvable(self, tier: SolverTier = SolverTier.BASIC) -> bool:
         """
         Determines if the current board can be solved deterministically
         (without guessing). Works on partially revealed boards.
         """
-        return self.solve()
+        return self.solve(tier=tier)
 
-    def solve(self, verbose: bool = False) -> bool:
+    def solve(self, verbose: bool = False, tier: SolverTier = SolverTier.BASIC, on_step: Optional[StepCallback] = None) -> bool:
         """
         Deterministically solve the board step by step:
         - Reveals safe squares
         - Flags certain mines
         Returns True if fully solved, False otherwise.
+
+        Only numbered cells next to a cell that changed are re-examined (the frontier),
+        using per-cell hidden/flagged neighbor counts that are updated on every move.
+        When the single-cell rules get stuck, higher tiers try pair-wise constraint
+        reasoning and then exact enumeration of frontier components.
+        `on_step` is called with a SolverStep right after every reveal or flag.
         """
-        progress = True
+        self._init_counts()
+        self._verbose = verbose
+        self._on_step = on_step
 
-        while progress:
-            progress = False
-            for r in range(self.board.rows):
-                for c in range(self.board.cols):
-                    cell = self.board.board[r][c]
+        worklist: Deque[Tuple[int, int]] = deque()
+        queued: Set[Tuple[int, int]] = set()
+        for r in range(self.board.rows):
+            for c in range(self.board.cols):
+                self._enqueue(r, c, worklist, queued)
 
-                    # Skip unrevealed, empty, flagged, or mines
-                    if cell in ("*", "0", "M", "F"):
-                        continue
+        while True:
+            self._propagate(worklist, queued)
+            if self._unrevealed == self.board.mines or tier == SolverTier.BASIC:
+                break
 
-                    num = int(cell)
-                    hidden_neighbors, flagged_count = self._get_neighbors(r, c)
+            safe, mines = self._subset_deductions()
+            if not safe and not mines and tier >= SolverTier.ENUMERATION:
+                safe, mines = self._enumeration_deductions()
+            if not safe and not mines:
+                break
 
-                    # Rule 1: all mines flagged → remaining hidden neighbors are safe
-                    if flagged_count == num and hidden_neighbors:
-                        for hr, hc in hidden_neighbors:
-                            if self.board.board[hr][hc] == "*":
-                                self.board.reveal(hr, hc)
-                                if (verbose): self.board.print_board()
-                                progress = True
+            for r, c in sorted(safe):
+                if self.board.board[r][c] == "*":
+                    self._reveal(r, c, worklist, queued)
+            for r, c in sorted(mines):
+                if self.board.board[r][c] == "*":
+                    self._flag(r, c, worklist, queued)
 
-                    # Rule 2: all hidden neighbors are mines
-                    elif flagged_count + len(hidden_neighbors) == num and hidden_neighbors:
-                        for hr, hc in hidden_neighbors:
-                            if self.board.board[hr][hc] == "*":
-                                self.board.flag(hr, hc)
-                                if (verbose): self.board.print_board()
-                                progress = True
+        # Board completely solved? Otherwise solving requires guessing
+        return self._unrevealed == self.board.mines
+
+    def _propagate(self, worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        """
+        Apply the single-cell rules until the worklist is empty or the board is won.
+        """
+        while worklist and self._unrevealed != self.board.mines:
+            r, c = worklist.popleft()
+            queued.discard((r, c))
 
-            # Board completely solved?
-            if self.board.check_win():
-                return True
+            num = int(self.board.board[r][c])
+            hidden_count = self._hidden_count[r][c]
+            flagged_count = self._flag_count[r][c]
+            if not hidden_count:
+                continue
+
+            # Rule 1: all mines flagged → remaining hidden neighbors are safe
+            if flagged_count == num:
+                for hr, hc in self._neighbors[r][c]:
+                    if self.board.board[hr][hc] == "*":
+                        self._reveal(hr, hc, worklist, queued)
+
+            # Rule 2: all hidden neighbors are mines
+            elif flagged_count + hidden_count == num:
+                for hr, hc in self._neighbors[r][c]:
+                    if self.board.board[hr][hc] == "*":
+                        self._flag(hr, hc, worklist, queued)
+
+    def _reveal(self, r: int, c: int, worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        revealed = self.board.reveal_cells(r, c)
+        if (self._verbose): self.board.print_board()
+        if self._on_step is not None:
+            self._on_step(SolverStep(r, c, "reveal", revealed))
+        self._on_revealed(revealed, worklist, queued)
+
+    def _flag(self, r: int, c: int, worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        self.board.flag(r, c)
+        if (self._verbose): self.board.print_board()
+        if self._on_step is not None:
+            self._on_step(SolverStep(r, c, "flag"))
+        self._on_flagged(r, c, worklist, queued)
+
+    def frontier_constraints(self) -> List[Constraint]:
+        """
+        Returns one constraint per revealed number that still has hidden neighbors.
+        Flagged cells are treated as mines.
+        """
+        constraints: List[Constraint] = []
+        seen: Set[Constraint] = set()
+        for r in range(self.board.rows):
+            for c in range(self.board.cols):
+                cell = self.board.board[r][c]
+                if cell in ("*", "0", "M", "F"):
+                    continue
+                hidden, flagged = self._get_neighbors(r, c)
+                if not hidden:
+                    continue
+                constraint = (frozenset(hidden), int(cell) - flagged)
+                if constraint not in seen:
+                    seen.add(constraint)
+                    constraints.append(constraint)
+        return constraints
+
+    def frontier_components(self) -> List[Tuple[List[Tuple[int, int]], List[Constraint]]]:
+        """
+        Split the frontier constraints into independent components (no shared hidden cells).
+        Returns a list of (cells, constraints) pairs with cells in a stable order.
+        """
+        constraints = self.frontier_constraints()
+        parent: Dict[Tuple[int, int], Tuple[int, int]] = {}
 
-        # No deterministic moves left, but not solved → requires guessing
-        return False
+        def find(cell: Tuple[int, int]) -> Tuple[int, int]:
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in constraints:
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            first, *rest = cells
+            for cell in rest:
+                parent[find(cell)] = find(first)
+
+        groups: Dict[Tuple[int, int], Tuple[List[Tuple[int, int]], List[Constraint]]] = {}
+        for cell in sorted(parent):
+            groups.setdefault(find(cell), ([], []))[0].append(cell)
+        for constraint in constraints:
+            groups[find(next(iter(constraint[0])))][1].append(constraint)
+        return list(groups.values())
+
+    def _subset_deductions(self) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+        """
+        Pair-wise rule: for overlapping constraints A and B, if B needs exactly |B - A| more
+        mines than A, then every cell of B - A is a mine and every cell of A - B is safe.
+        Returns (safe cells, mine cells).
+        """
+        constraints = self.frontier_constraints()
+        by_cell: Dict[Tuple[int, int], List[int]] = {}
+        for i, (cells, _) in enumerate(constraints):
+            for cell in cells:
+                by_cell.setdefault(cell, []).append(i)
+
+        safe: Set[Tuple[int, int]] = set()
+        mines: Set[Tuple[int, int]] = set()
+        for i, (a_cells, a_mines) in enumerate(constraints):
+            overlapping = {j for cell in a_cells for j in by_cell[cell] if j != i}
+            for j in overlapping:
+                b_cells, b_mines = constraints[j]
+                only_b = b_cells - a_cells
+                if b_mines - a_mines == len(only_b):
+                    mines |= only_b
+                    safe |= a_cells - b_cells
+        return safe, mines
+
+    def _enumeration_deductions(self) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+        """
+        Enumerate every consistent mine assignment of each frontier component with at most
+        MAX_COMPONENT_SIZE hidden cells. Cells that are safe (or a mine) in every assignment
+        are returned as (safe cells, mine cells).
+        """
+        safe: Set[Tuple[int, int]] = set()
+        mines: Set[Tuple[int, int]] = set()
+        for cells, constraints in self.frontier_components():
+            if len(cells) > MAX_COMPONENT_SIZE:
+                continue
+            solutions, mine_counts = self._enumerate_component(cells, constraints)
+            if not solutions:
+                continue
+            for cell, count in zip(cells, mine_counts):
+                if count == 0:
+                    safe.add(cell)
+                elif count == solutions:
+                    mines.add(cell)
+        return safe, mines
+
+    def _enumerate_component(self, cells: List[Tuple[int, int]], constraints: List[Constraint]) -> Tuple[int, List[int]]:
+        """
+        Backtrack over all mine assignments of `cells` satisfying `constraints`.
+        Returns (number of solutions, number of solutions in which each cell is a mine).
+        """
+        index = {cell: i for i, cell in enumerate(cells)}
+        var_constraints: List[List[int]] = [[] for _ in cells]
+        need: List[int] = []
+        remaining: List[int] = []
+        for ci, (constraint_cells, constraint_mines) in enumerate(constraints):
+            for cell in constraint_cells:
+                var_constraints[index[cell]].append(ci)
+            need.append(constraint_mines)
+            remaining.append(len(constraint_cells))
+
+        assignment = [0] * len(cells)
+        mine_counts = [0] * len(cells)
+        solutions = 0
+
+        def backtrack(i: int) -> None:
+            nonlocal solutions
+            if i == len(cells):
+                solutions += 1
+                for v, value in enumerate(assignment):
+                    mine_counts[v] += value
+                return
+            for value in (0, 1):
+                for ci in var_constraints[i]:
+                    need[ci] -= value
+                    remaining[ci] -= 1
+                if all(0 <= need[ci] <= remaining[ci] for ci in var_constraints[i]):
+                    assignment[i] = value
+                    backtrack(i + 1)
+                for ci in var_constraints[i]:
+                    need[ci] += value
+                    remaining[ci] += 1
+            assignment[i] = 0
+
+        backtrack(0)
+        return solutions, mine_counts
+
+    def _init_counts(self) -> None:
+        """
+        Compute hidden/flagged neighbor counts for every cell from the current board.
+        """
+        board = self.board.board
+        self._unrevealed = sum(cell in ("*", "F") for row in board for cell in row)
+        self._hidden_count = [[0] * self.board.cols for _ in range(self.board.rows)]
+        self._flag_count = [[0] * self.board.cols for _ in range(self.board.rows)]
+        for r in range(self.board.rows):
+            for c in range(self.board.cols):
+                for nr, nc in self._neighbors[r][c]:
+                    if board[nr][nc] == "*":
+                        self._hidden_count[r][c] += 1
+                    elif board[nr][nc] == "F":
+                        self._flag_count[r][c] += 1
+
+    def _enqueue(self, r: int, c: int, worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        """
+        Queue a revealed numbered cell that still has hidden neighbors.
+        """
+        # Skip unrevealed, empty, flagged, or mines
+        if self.board.board[r][c] in ("*", "0", "M", "F"):
+            return
+        if self._hidden_count[r][c] and (r, c) not in queued:
+            worklist.append((r, c))
+            queued.add((r, c))
+
+    def _on_revealed(self, revealed: List[Tuple[int, int]], worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        self._unrevealed -= len(revealed)
+        for r, c in revealed:
+            for nr, nc in self._neighbors[r][c]:
+                self._hidden_count[nr][nc] -= 1
+        for r, c in revealed:
+            self._enqueue(r, c, worklist, queued)
+            for nr, nc in self._neighbors[r][c]:
+                self._enqueue(nr, nc, worklist, queued)
+
+    def _on_flagged(self, r: int, c: int, worklist: Deque[Tuple[int, int]], queued: Set[Tuple[int, int]]) -> None:
+        for nr, nc in self._neighbors[r][c]:
+            self._hidden_count[nr][nc] -= 1
+            self._flag_count[nr][nc] += 1
+            self._enqueue(nr, nc, worklist, queued)
 
     def _get_neighbors(self, r: int, c: int) -> Tuple[List[Tuple[int, int]], int]:
         """
@@ -67,16 +317,11 @@ class MinesweeperSolver:
         hidden: List[Tuple[int, int]] = []
         flagged: int = 0
 
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.board.rows and 0 <= nc < self.board.cols:
-                    neighbor = self.board.board[nr][nc]
-                    if neighbor == "*":
-                        hidden.append((nr, nc))
-                    elif neighbor == "F":
-                        flagged += 1
+        for nr, nc in self._neighbors[r][c]:
+            neighbor = self.board.board[nr][nc]
+            if neighbor == "*":
+                hidden.append((nr, nc))
+            elif neighbor == "F":
+                flagged += 1
 
         return hidden, flagged
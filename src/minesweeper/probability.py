@@ -0,0 +1,187 @@
+# src/minesweeper/probability.py
+from __future__ import annotations
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from src.minesweeper.board import Board
+from src.minesweeper.minesweepersolver import Constraint, MinesweeperSolver
+
+# Per-component counts: totals[k] = number of assignments with k mines,
+# cell_counts[j][k] = number of those assignments where cell j is a mine
+ComponentCounts = Tuple[List[int], List[List[int]]]
+
+
+class MineProbability:
+    """
+    Exact P(mine) for every cell of a partially revealed board.
+    The frontier is split into independent constraint components (see
+    MinesweeperSolver.frontier_components), each component is counted with
+    memoized backtracking, and the components are combined with the global
+    mine count by weighting every frontier mine total with the number of ways
+    to place the remaining mines on unconstrained cells.
+    Flagged cells are assumed to be mines.
+    """
+
+    def __init__(self, board: Board):
+        self.board: Board = board
+        self.solver: MinesweeperSolver = MinesweeperSolver(board)
+
+    def probabilities(self) -> List[List[float]]:
+        """
+        Returns a rows x cols grid of mine probabilities: 0.0 for revealed cells,
+        1.0 for flagged cells (and revealed mines).
+        """
+        board = self.board.board
+        probs = [[0.0] * self.board.cols for _ in range(self.board.rows)]
+        known_mines = 0
+        hidden = set()
+        for r in range(self.board.rows):
+            for c in range(self.board.cols):
+                if board[r][c] in ("F", "M"):
+                    probs[r][c] = 1.0
+                    known_mines += 1
+                elif board[r][c] == "*":
+                    hidden.add((r, c))
+
+        components = self.solver.frontier_components()
+        counts = [self._count_component(cells, constraints) for cells, constraints in components]
+        for cells, _ in components:
+            hidden.difference_update(cells)
+        unconstrained = len(hidden)
+        remaining = self.board.mines - known_mines
+
+        # weights[K] = ways to place the remaining mines outside the frontier if the frontier holds K
+        frontier_size = sum(len(cells) for cells, _ in components)
+        weights = [
+            comb(unconstrained, remaining - k) if 0 <= remaining - k <= unconstrained else 0
+            for k in range(frontier_size + 1)
+        ]
+
+        total = _convolve_all([totals for totals, _ in counts])
+        norm = sum(t * w for t, w in zip(total, weights))
+        if norm == 0:
+            raise ValueError("Board state is inconsistent: no mine placement matches the revealed numbers and flags.")
+
+        for i, ((cells, _), (_, cell_counts)) in enumerate(zip(components, counts)):
+            rest = _convolve_all([totals for j, (totals, _) in enumerate(counts) if j != i])
+            # g[k] = weight of every completion given that this component holds k mines
+            g = [
+                sum(w * weights[k + kr] for kr, w in enumerate(rest) if w and k + kr <= frontier_size)
+                for k in range(len(cells) + 1)
+            ]
+            for (r, c), by_k in zip(cells, cell_counts):
+                probs[r][c] = sum(n * g[k] for k, n in enumerate(by_k) if n) / norm
+
+        if unconstrained:
+            expected = sum(t * w * (remaining - k) for k, (t, w) in enumerate(zip(total, weights)) if t and w)
+            p_unconstrained = expected / (norm * unconstrained)
+            for r, c in hidden:
+                probs[r][c] = p_unconstrained
+
+        return probs
+
+    def safest_cell(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the hidden, unflagged cell with the lowest mine probability (None if there is none).
+        """
+        probs = self.probabilities()
+        candidates = [
+            (probs[r][c], r, c)
+            for r in range(self.board.rows)
+            for c in range(self.board.cols)
+            if self.board.board[r][c] == "*"
+        ]
+        if not candidates:
+            return None
+        _, r, c = min(candidates)
+        return r, c
+
+    def _count_component(self, cells: List[Tuple[int, int]], constraints: List[Constraint]) -> ComponentCounts:
+        """
+        Count the mine assignments of one component by number of mines, overall and per cell.
+        Cells are assigned in order and sub-results are memoized on the residual mine counts
+        of the constraints that straddle the current position, so neighboring rows (or columns)
+        are what bounds the work instead of the full component size.
+        """
+        # Walk along the longer side of the component to keep the straddling constraints few
+        rows = {r for r, _ in cells}
+        cols = {c for _, c in cells}
+        if len(cols) > len(rows):
+            order = sorted(range(len(cells)), key=lambda i: (cells[i][1], cells[i][0]))
+        else:
+            order = sorted(range(len(cells)), key=lambda i: cells[i])
+        ordered = [cells[i] for i in order]
+        n = len(ordered)
+
+        index = {cell: i for i, cell in enumerate(ordered)}
+        var_constraints: List[List[int]] = [[] for _ in ordered]
+        need: List[int] = []
+        remaining: List[int] = []
+        first: List[int] = []
+        last: List[int] = []
+        for ci, (constraint_cells, constraint_mines) in enumerate(constraints):
+            positions = [index[cell] for cell in constraint_cells]
+            for i in positions:
+                var_constraints[i].append(ci)
+            need.append(constraint_mines)
+            remaining.append(len(positions))
+            first.append(min(positions))
+            last.append(max(positions))
+        active = [[ci for ci in range(len(constraints)) if first[ci] < i <= last[ci]] for i in range(n + 1)]
+
+        memo: Dict[Tuple[int, Tuple[int, ...]], ComponentCounts] = {}
+
+        def count(i: int) -> ComponentCounts:
+            if i == n:
+                return [1], []
+            key = (i, tuple(need[ci] for ci in active[i]))
+            if key in memo:
+                return memo[key]
+
+            totals = [0] * (n - i + 1)
+            cell_counts = [[0] * (n - i + 1) for _ in range(n - i)]
+            for value in (0, 1):
+                for ci in var_constraints[i]:
+                    need[ci] -= value
+                    remaining[ci] -= 1
+                if all(0 <= need[ci] <= remaining[ci] for ci in var_constraints[i]):
+                    sub_totals, sub_cells = count(i + 1)
+                    for k, w in enumerate(sub_totals):
+                        if w:
+                            totals[k + value] += w
+                            if value:
+                                cell_counts[0][k + 1] += w
+                    for j, by_k in enumerate(sub_cells):
+                        row = cell_counts[j + 1]
+                        for k, w in enumerate(by_k):
+                            if w:
+                                row[k + value] += w
+                for ci in var_constraints[i]:
+                    need[ci] += value
+                    remaining[ci] += 1
+
+            memo[key] = (totals, cell_counts)
+            return memo[key]
+
+        totals, ordered_counts = count(0)
+        # Map the per-cell counts back to the order of `cells`
+        cell_counts = [[] for _ in cells]
+        for i, by_k in zip(order, ordered_counts):
+            cell_counts[i] = by_k
+        return totals, cell_counts
+
+
+def _convolve_all(polys: List[List[int]]) -> List[int]:
+    """
+    Multiply count polynomials (index = number of mines).
+    """
+    result = [1]
+    for poly in polys:
+        product = [0] * (len(result) + len(poly) - 1)
+        for i, a in enumerate(result):
+            if a:
+                for j, b in enumerate(poly):
+                    if b:
+                        product[i + j] += a * b
+        result = product
+    return result
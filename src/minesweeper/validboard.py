@@ -1,57 +1,149 @@
 # src/minesweeper/valid_board.py
-from src.minesweeper.board import Board
-from src.minesweeper.minesweepersolver import MinesweeperSolver
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import time
+import numpy as np
+
+from src.minesweeper.arrayboard import ArrayBoard, MINE
+from src.minesweeper.minesweepersolver import MinesweeperSolver, SolverTier
+
+MAX_BOARD_CREATION_ATTEMPTS = 10000
+
+# Rejection reasons tracked in GenerationStats.rejections
+REJECT_MINE_AT_CLICK = "mine_at_click"
+REJECT_NON_ZERO = "non_zero"
+REJECT_UNSOLVABLE = "unsolvable"
+
+# Timed stages tracked in GenerationStats.stage_times (seconds)
+STAGE_GENERATE = "generate"
+STAGE_REVEAL = "reveal"
+STAGE_SOLVE = "solve"
+
+
+@dataclass
+class GenerationStats:
+    attempts: int = 0
+    accepted: int = 0
+    rejections: Dict[str, int] = field(
+        default_factory=lambda: {REJECT_MINE_AT_CLICK: 0, REJECT_NON_ZERO: 0, REJECT_UNSOLVABLE: 0}
+    )
+    stage_times: Dict[str, float] = field(
+        default_factory=lambda: {STAGE_GENERATE: 0.0, STAGE_REVEAL: 0.0, STAGE_SOLVE: 0.0}
+    )
+    wall_time: float = 0.0  # seconds spent in first_move, loop and conversion overhead included
+
+    @property
+    def acceptance_rate(self) -> float:
+        """
+        Fraction of generated candidate boards that were accepted.
+        """
+        return self.accepted / self.attempts if self.attempts else 0.0
+
+    @property
+    def stage_time(self) -> float:
+        """
+        Total time spent in the timed stages (at most wall_time).
+        """
+        return sum(self.stage_times.values())
+
+
+class BoardGenerationError(RuntimeError):
+    """
+    Raised when no valid board is found within the attempt budget or deadline.
+    """
+
+    def __init__(self, message: str, stats: GenerationStats):
+        super().__init__(message)
+        self.stats: GenerationStats = stats
 
-# MAX_BOARD_CREATION_ATTEMPTS = 10000
 
 class ValidBoard:
-    def __init__(self, rows=8, cols=8, mines=16):
+    def __init__(
+            self,
+            rows=8,
+            cols=8,
+            mines=16,
+            rng: Optional[np.random.Generator] = None,
+            safe_first_click: bool = True,
+            max_attempts: Optional[int] = MAX_BOARD_CREATION_ATTEMPTS,
+            deadline: Optional[float] = None,
+            tier: SolverTier = SolverTier.BASIC,
+        ):
+        """
+        max_attempts: number of candidate boards to try before giving up (None for no limit).
+        deadline: seconds allowed for generating the board (None for no limit).
+        tier: deduction tier the solver may use to prove a board solvable.
+        """
         if mines >= rows * cols:
             raise ValueError("Number of mines must be less than total board spaces to allow at least one empty square.")
         self.rows = rows
         self.cols = cols
         self.mines = mines
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.safe_first_click = safe_first_click
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.tier = tier
         self.board = None
         self.first_move_done = False
+        self.stats = GenerationStats()
 
     def first_move(self, r: int, c: int) -> bool:
         """
         Generate a valid board only after the first move.
         Ensures first click reveals a 0 and that the board is solvable.
+        With `safe_first_click`, mines are never placed around the first click,
+        so only the solvability check can reject a candidate.
+        Raises BoardGenerationError (carrying self.stats) when the budget is exhausted.
         """
-        # for _ in range(MAX_BOARD_CREATION_ATTEMPTS):
-        while True:
-            board = Board(self.rows, self.cols, self.mines)
-            board.generate_random_board()
+        safe_cell = (r, c) if self.safe_first_click else None
+        stats = self.stats
+        start = time.perf_counter()
 
-            # Reveal the first clicked cell
-            alive = board.reveal(r, c)
-            if not alive:
-                continue  # shouldn't happen since we avoid mine on first click
+        while self.max_attempts is None or stats.attempts < self.max_attempts:
+            if self.deadline is not None and time.perf_counter() - start > self.deadline:
+                break
 
-            # Ensure it's a 0
-            if board.hidden_board[r][c] != 0:
+            # Candidates are generated on the array-backed board, only survivors become a Board
+            t0 = time.perf_counter()
+            board = ArrayBoard(self.rows, self.cols, self.mines, rng=self.rng)
+            board.generate_random_board(safe_cell=safe_cell)
+            stats.attempts += 1
+            stats.stage_times[STAGE_GENERATE] += time.perf_counter() - t0
+
+            # Ensure the first clicked cell is a 0 before revealing
+            if board.hidden[r, c] == MINE:
+                stats.rejections[REJECT_MINE_AT_CLICK] += 1
+                continue
+            if board.hidden[r, c] != 0:
+                stats.rejections[REJECT_NON_ZERO] += 1
                 continue
 
-            # copy constructor
-            solver_board = Board(
-                rows=board.rows,
-                cols=board.cols,
-                mines=board.mines,
-                board_data=board.board,
-                hidden_data=board.hidden_board
-            )
-
-            # Pass the partially revealed board to solver
-            solver = MinesweeperSolver(solver_board)
-            if solver.is_solvable():
-                self.board = board
+            # Reveal the first clicked cell
+            t0 = time.perf_counter()
+            board.reveal(r, c)
+            stats.stage_times[STAGE_REVEAL] += time.perf_counter() - t0
+
+            # Pass the partially revealed board to solver (to_board returns a fresh copy)
+            t0 = time.perf_counter()
+            solver = MinesweeperSolver(board.to_board())
+            solvable = solver.is_solvable(tier=self.tier)
+            stats.stage_times[STAGE_SOLVE] += time.perf_counter() - t0
+
+            if solvable:
+                self.board = board.to_board()
                 self.first_move_done = True
-                break
-        # else:
-        #     raise RuntimeError(f"Failed to generate a valid board after {MAX_BOARD_CREATION_ATTEMPTS} attempts.")
+                stats.accepted += 1
+                stats.wall_time += time.perf_counter() - start
+                return True
+            stats.rejections[REJECT_UNSOLVABLE] += 1
 
-        return True
+        stats.wall_time += time.perf_counter() - start
+        raise BoardGenerationError(
+            f"Failed to generate a valid {self.rows}x{self.cols} board with {self.mines} mines "
+            f"after {stats.attempts} attempts ({time.perf_counter() - start:.2f}s), rejections: {stats.rejections}.",
+            stats,
+        )
 
     def reveal(self, r: int, c: int) -> bool:
         if not self.first_move_done:
@@ -1,8 +1,71 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
 
 @dataclass
 class MinesweeperExample:
     input: str
     board_state: List[List[str]]
     hidden_state: List[List[str]]
+    action: Optional[str] = None  # next solver move, in the prompt's move format
+
+    @property
+    def rows(self) -> int:
+        return len(self.board_state)
+
+    @property
+    def cols(self) -> int:
+        return len(self.board_state[0])
+
+@dataclass
+class GameMove:
+    row: int  # 0-indexed
+    col: int  # 0-indexed
+    action: str  # "reveal" or "flag"
+    revealed: List[Tuple[int, int]] = field(default_factory=list)  # cells uncovered by a reveal
+
+@dataclass
+class GameRecord:
+    """
+    A solved game stored as deltas: the board right after the first click plus the ordered
+    solver moves. Step i is the board after moves[0..i], materialized on demand.
+    """
+    game_index: int
+    rows: int
+    cols: int
+    mines: int
+    start_row: int  # 0-indexed
+    start_col: int  # 0-indexed
+    hidden_state: List[List[str]]
+    initial_state: List[List[str]]
+    moves: List[GameMove]
+
+    def iter_steps(self) -> Iterator[List[List[str]]]:
+        """
+        Yield the board after every move, applying one delta at a time.
+        """
+        board = [row[:] for row in self.initial_state]
+        for move in self.moves:
+            self._apply(board, move)
+            yield [row[:] for row in board]
+
+    def board_at(self, step: int) -> List[List[str]]:
+        """
+        Materialize the board after move `step` (0-indexed, like stepK.txt).
+        """
+        if not 0 <= step < len(self.moves):
+            raise IndexError(f"Step {step} out of range for a game with {len(self.moves)} moves")
+        board = [row[:] for row in self.initial_state]
+        for move in self.moves[:step + 1]:
+            self._apply(board, move)
+        return board
+
+    def _apply(self, board: List[List[str]], move: GameMove) -> None:
+        if move.action == "flag":
+            board[move.row][move.col] = "F"
+        else:
+            for r, c in move.revealed:
+                board[r][c] = self.hidden_state[r][c]
+
+    @property
+    def steps(self) -> List[List[List[str]]]:
+        return list(self.iter_steps())
@@ -0,0 +1,217 @@
+# src/server/app.py
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+import uuid
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+from src.minesweeper.validboard import BoardGenerationError, ValidBoard
+
+# Bounds that keep every session small (a board is at most MAX_ROWS x MAX_COLS cells)
+MAX_ROWS = 32
+MAX_COLS = 32
+MAX_SESSIONS = 10000
+IDLE_TIMEOUT = 300.0  # seconds without a request before a session is evicted
+EVICTION_INTERVAL = 30.0  # seconds between idle sweeps
+FIRST_MOVE_DEADLINE = 2.0  # seconds allowed to generate a valid board on the first reveal
+
+# Session status values
+STATUS_PLAYING = "playing"
+STATUS_WON = "won"
+STATUS_LOST = "lost"
+
+
+class CreateGameRequest(BaseModel):
+    rows: int = Field(8, ge=2, le=MAX_ROWS)
+    cols: int = Field(8, ge=2, le=MAX_COLS)
+    mines: int = Field(10, ge=1)
+    seed: Optional[int] = None
+
+
+class MoveRequest(BaseModel):
+    row: int = Field(ge=0)  # 0-indexed
+    col: int = Field(ge=0)  # 0-indexed
+
+
+class GameSession:
+    """
+    One hosted game. The ValidBoard only builds its board on the first reveal, so a new
+    session holds nothing but its settings. The lock serializes moves on this game while
+    the first reveal runs in a worker thread.
+    """
+
+    def __init__(self, game_id: str, rows: int, cols: int, mines: int, seed: Optional[int] = None):
+        self.game_id: str = game_id
+        self.valid_board = ValidBoard(rows=rows, cols=cols, mines=mines, rng=np.random.default_rng(seed),
+                                      deadline=FIRST_MOVE_DEADLINE)
+        self.status: str = STATUS_PLAYING
+        self.moves: int = 0
+        self.last_used: float = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def state(self) -> Dict[str, Any]:
+        vb = self.valid_board
+        board: List[List[str]] = (
+            [[str(cell) for cell in row] for row in vb.board.board] if vb.board
+            else [["*"] * vb.cols for _ in range(vb.rows)]
+        )
+        state = {
+            "game_id": self.game_id,
+            "rows": vb.rows,
+            "cols": vb.cols,
+            "mines": vb.mines,
+            "status": self.status,
+            "moves": self.moves,
+            "board": board,
+        }
+        if self.status != STATUS_PLAYING:
+            state["hidden"] = [[str(cell) for cell in row] for row in vb.board.hidden_board]
+        return state
+
+
+class SessionStore:
+    """
+    Sessions by id in least-recently-used order, so idle sessions are found from the front.
+    Full stores evict idle sessions first and refuse new games if none are idle.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = IDLE_TIMEOUT):
+        self.max_sessions: int = max_sessions
+        self.idle_timeout: float = idle_timeout
+        self.sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+
+    def create(self, rows: int, cols: int, mines: int, seed: Optional[int] = None) -> GameSession:
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPException(status_code=503, detail=f"Session limit reached ({self.max_sessions} active games)")
+        try:
+            session = GameSession(uuid.uuid4().hex, rows, cols, mines, seed)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        self.sessions[session.game_id] = session
+        return session
+
+    def get(self, game_id: str) -> GameSession:
+        session = self.sessions.get(game_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Unknown game: {game_id}")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(game_id)
+        return session
+
+    def delete(self, game_id: str) -> None:
+        if self.sessions.pop(game_id, None) is None:
+            raise HTTPException(status_code=404, detail=f"Unknown game: {game_id}")
+
+    def evict_idle(self) -> int:
+        """
+        Drop sessions idle for longer than idle_timeout. Returns how many were evicted.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            game_id, session = next(iter(self.sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self.sessions[game_id]
+            evicted += 1
+        return evicted
+
+
+def create_app(
+        max_sessions: int = MAX_SESSIONS,
+        idle_timeout: float = IDLE_TIMEOUT,
+        eviction_interval: float = EVICTION_INTERVAL,
+    ) -> FastAPI:
+    store = SessionStore(max_sessions=max_sessions, idle_timeout=idle_timeout)
+
+    async def evict_periodically():
+        while True:
+            await asyncio.sleep(eviction_interval)
+            evicted = store.evict_idle()
+            if evicted:
+                print(f"[INFO] Evicted {evicted} idle sessions, {len(store.sessions)} active.")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        task = asyncio.create_task(evict_periodically())
+        yield
+        task.cancel()
+
+    app = FastAPI(title="MinesweeperGPT game server", lifespan=lifespan)
+    app.state.store = store
+
+    @app.post("/games")
+    async def create_game(request: CreateGameRequest) -> Dict[str, Any]:
+        return store.create(request.rows, request.cols, request.mines, request.seed).state()
+
+    @app.get("/games/{game_id}")
+    async def get_game(game_id: str) -> Dict[str, Any]:
+        return store.get(game_id).state()
+
+    @app.delete("/games/{game_id}")
+    async def delete_game(game_id: str) -> Dict[str, Any]:
+        store.delete(game_id)
+        return {"game_id": game_id, "deleted": True}
+
+    @app.post("/games/{game_id}/reveal")
+    async def reveal(game_id: str, move: MoveRequest) -> Dict[str, Any]:
+        session = store.get(game_id)
+        async with session.lock:
+            vb = _check_move(session, move)
+            try:
+                if vb.first_move_done:
+                    alive = vb.reveal(move.row, move.col)
+                else:
+                    # Board generation runs the solver, keep it off the event loop
+                    alive = await asyncio.to_thread(vb.reveal, move.row, move.col)
+            except BoardGenerationError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            session.moves += 1
+            if not alive:
+                session.status = STATUS_LOST
+            elif vb.check_win():
+                session.status = STATUS_WON
+            return session.state()
+
+    @app.post("/games/{game_id}/flag")
+    async def flag(game_id: str, move: MoveRequest) -> Dict[str, Any]:
+        session = store.get(game_id)
+        async with session.lock:
+            vb = _check_move(session, move)
+            if not vb.first_move_done:
+                raise HTTPException(status_code=409, detail="The first move must be a reveal")
+            vb.flag(move.row, move.col)
+            session.moves += 1
+            return session.state()
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        return {"sessions": len(store.sessions), "max_sessions": store.max_sessions}
+
+    return app
+
+
+def _check_move(session: GameSession, move: MoveRequest) -> ValidBoard:
+    vb = session.valid_board
+    if session.status != STATUS_PLAYING:
+        raise HTTPException(status_code=409, detail=f"Game is over ({session.status})")
+    if move.row >= vb.rows or move.col >= vb.cols:
+        raise HTTPException(status_code=422, detail=f"Cell ({move.row}, {move.col}) is outside the {vb.rows}x{vb.cols} board")
+    return vb
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=8000)
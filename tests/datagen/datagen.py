@@ -0,0 +1,48 @@
+# tests/datagen/datagen.py
+import pytest
+from src.datagen.datagen import DataGenerator
+
+
+def read_games(directory):
+    return {
+        path.relative_to(directory).as_posix(): path.read_text()
+        for path in sorted(directory.rglob("*.txt"))
+    }
+
+
+def test_parallel_generation_is_reproducible(tmp_path):
+    sequential = DataGenerator(str(tmp_path / "sequential"), seed=7)
+    sequential.generate_games(num_games=6)
+    parallel = DataGenerator(str(tmp_path / "parallel"), seed=7)
+    parallel.generate_games(num_games=6, workers=3)
+
+    assert sorted(p.name for p in (tmp_path / "parallel").iterdir()) == [f"game{i}" for i in range(6)]
+    assert read_games(tmp_path / "sequential") == read_games(tmp_path / "parallel")
+
+
+def test_new_games_do_not_overwrite_existing_ones(tmp_path):
+    generator = DataGenerator(str(tmp_path), seed=1)
+    generator.generate_games(num_games=2, workers=2)
+    generator.generate_games(num_games=2, workers=2)
+    assert generator.game_counter == 4
+    assert DataGenerator(str(tmp_path)).game_counter == 4
+
+
+def test_consecutive_calls_generate_different_games(tmp_path):
+    generator = DataGenerator(str(tmp_path), seed=3)
+    generator.generate_games(num_games=2)
+    generator.generate_games(num_games=2)
+    hidden = [(tmp_path / f"game{i}" / "hidden_state.txt").read_text() for i in range(4)]
+    assert len(set(hidden)) == 4
+
+    # The first call matches a fresh generator, whichever call a game came from
+    fresh = DataGenerator(str(tmp_path / "fresh"), seed=3)
+    fresh.generate_games(num_games=4)
+    assert [(tmp_path / "fresh" / f"game{i}" / "hidden_state.txt").read_text() for i in range(4)] == hidden
+
+
+def test_mine_range_must_fit_outside_the_first_click(tmp_path):
+    # 4x4 board: an interior first click leaves 16 - 9 = 7 cells for mines
+    DataGenerator(str(tmp_path), rows=4, cols=4, min_mines=1, max_mines=7)
+    with pytest.raises(ValueError):
+        DataGenerator(str(tmp_path), rows=4, cols=4, min_mines=1, max_mines=8)
@@ -0,0 +1,49 @@
+# tests/datagen/gameshard.py
+from src.datagen.datagen import DataGenerator, FORMAT_SHARDS
+from src.datagen.gameshard import read_game_shard
+from src.finetuning.dataset import MinesweeperDatasetLoader
+
+
+def without_action(examples):
+    return sorted(((ex.input, ex.board_state, ex.hidden_state) for ex in examples), key=str)
+
+
+def test_shards_round_trip_and_load_like_text(tmp_path):
+    DataGenerator(str(tmp_path / "text"), seed=5).generate_games(num_games=7)
+    sharded = DataGenerator(str(tmp_path / "shards"), seed=5, output_format=FORMAT_SHARDS, shard_size=3)
+    sharded.generate_games(num_games=7)
+
+    shards = sorted((tmp_path / "shards").glob("shard*.npz"))
+    assert [p.name for p in shards] == ["shard0-3.npz", "shard3-6.npz", "shard6-7.npz"]
+    assert DataGenerator(str(tmp_path / "shards")).game_counter == 7
+
+    records = [record for shard in shards for record in read_game_shard(shard)]
+    assert [record.game_index for record in records] == list(range(7))
+    for record in records:
+        game = tmp_path / "text" / f"game{record.game_index}"
+        step_files = sorted(game.glob("step*.txt"), key=lambda p: int(p.stem[4:]))
+        assert len(record.moves) == len(step_files)
+        assert record.hidden_state == [line.split() for line in (game / "hidden_state.txt").read_text().splitlines()]
+        for i, step_file in enumerate(step_files):
+            expected = [line.split() for line in step_file.read_text().splitlines() if line.strip()]
+            assert record.board_at(i) == expected
+            assert record.steps[i] == expected
+
+    text_examples = MinesweeperDatasetLoader(str(tmp_path / "text")).load_examples()
+    shard_examples = MinesweeperDatasetLoader(str(tmp_path / "shards")).load_examples()
+    assert without_action(text_examples) == without_action(shard_examples)
+
+    # The action label of every shard example is the move that leads to the next step
+    for example in shard_examples:
+        assert example.action is not None and example.action.startswith("row: ")
+
+    # Text games derive the same label from consecutive steps, up to which 0 of a flood fill is named
+    text_in_order = MinesweeperDatasetLoader(str(tmp_path / "text")).load_examples(shuffle=False)
+    shard_in_order = MinesweeperDatasetLoader(str(tmp_path / "shards")).load_examples(shuffle=False)
+    assert len(text_in_order) == len(shard_in_order)
+    for text_example, shard_example in zip(text_in_order, shard_in_order):
+        assert text_example.input == shard_example.input
+        if text_example.action != shard_example.action:
+            row, col = (int(part.split(": ")[1]) - 1 for part in shard_example.action.split(", ")[:2])
+            assert shard_example.action.endswith("reveal") and text_example.action.endswith("reveal")
+            assert shard_example.hidden_state[row][col] == "0"
@@ -0,0 +1,101 @@
+# tests/finetuning/datasetloader.py
+from src.datagen.datagen import DataGenerator, FORMAT_SHARDS
+from src.finetuning.dataset import MinesweeperDatasetLoader
+from src.finetuning.encoders import COMPACT_ENCODER, get_encoder
+from src.finetuning.prompt import build_system_prompt
+
+
+def row_key(row):
+    return str(row["prompt"]), str(row["hidden_state"])
+
+
+def test_streaming_dataset_matches_in_memory_dataset(tmp_path):
+    DataGenerator(str(tmp_path), seed=2).generate_games(num_games=3)
+    DataGenerator(str(tmp_path), seed=3, output_format=FORMAT_SHARDS).generate_games(num_games=3)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+
+    in_memory = list(loader.to_hf_dataset())
+    streamed = list(loader.to_hf_dataset(streaming=True, shuffle_buffer=8, seed=0))
+    assert sorted(streamed, key=row_key) == sorted(in_memory, key=row_key)
+
+    # Same seed, same order
+    assert list(loader.to_hf_dataset(streaming=True, shuffle_buffer=8, seed=0)) == streamed
+
+
+def test_cache_is_reused_until_sources_change(tmp_path):
+    DataGenerator(str(tmp_path), seed=4).generate_games(num_games=3)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+
+    key = loader.cache_key()
+    built = loader.to_hf_dataset(cache=True, seed=0)
+    assert (tmp_path / ".cache" / key).exists()
+    assert list(MinesweeperDatasetLoader(str(tmp_path)).to_hf_dataset(cache=True, seed=0)) == list(built)
+
+    # A new game changes the manifest, so the cache is rebuilt and the old entry removed
+    DataGenerator(str(tmp_path), seed=5).generate_games(num_games=1)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+    assert loader.cache_key() != key
+    rebuilt = loader.to_hf_dataset(cache=True)
+    assert len(rebuilt) > len(built)
+    assert [p.name for p in (tmp_path / ".cache").iterdir()] == [loader.cache_key()]
+
+
+def test_cache_keeps_seeded_order_and_other_encoders(tmp_path, monkeypatch):
+    DataGenerator(str(tmp_path), seed=4).generate_games(num_games=3)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+
+    loader.to_hf_dataset(cache=True, seed=1)
+    # A cache hit is shuffled with the requested seed, like an uncached load
+    assert list(loader.to_hf_dataset(cache=True, seed=2)) == list(loader.to_hf_dataset(seed=2))
+
+    # Building another encoder's cache keeps this one
+    compact = MinesweeperDatasetLoader(str(tmp_path), encoder=COMPACT_ENCODER)
+    compact.to_hf_dataset(cache=True)
+    assert sorted(p.name for p in (tmp_path / ".cache").iterdir()) == sorted([loader.cache_key(), compact.cache_key()])
+
+    # Editing an encoder description changes the rendered prompt, so the key changes too
+    key = compact.cache_key()
+    monkeypatch.setattr(get_encoder(COMPACT_ENCODER), "description", "One row per line.")
+    build_system_prompt.cache_clear()
+    try:
+        assert compact.cache_key() != key
+    finally:
+        monkeypatch.undo()
+        build_system_prompt.cache_clear()
+
+
+def test_parallel_loading_matches_serial_loading(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.finetuning.dataset.LOAD_CHUNK_SIZE", 2)
+    DataGenerator(str(tmp_path), seed=6).generate_games(num_games=5)
+    DataGenerator(str(tmp_path), seed=7, output_format=FORMAT_SHARDS, shard_size=2).generate_games(num_games=3)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+
+    serial = loader.load_examples(shuffle=False)
+    assert loader.load_examples(workers=2, shuffle=False) == serial
+
+    # Same seed, same shuffle for any number of workers
+    shuffled = loader.load_examples(seed=1)
+    assert loader.load_examples(workers=3, seed=1) == shuffled
+    assert sorted(shuffled, key=lambda ex: (ex.input, str(ex.hidden_state))) == \
+        sorted(serial, key=lambda ex: (ex.input, str(ex.hidden_state)))
+
+
+def test_mixed_board_sizes_are_carried_per_row_and_bucketed(tmp_path):
+    DataGenerator(str(tmp_path), seed=8).generate_games(num_games=3)
+    DataGenerator(str(tmp_path), seed=9, rows=8, cols=6, min_mines=6, max_mines=8,
+                  output_format=FORMAT_SHARDS).generate_games(num_games=3)
+    loader = MinesweeperDatasetLoader(str(tmp_path))
+
+    dataset = loader.to_hf_dataset(seed=0)
+    sizes = {(row["rows"], row["cols"]) for row in dataset}
+    assert sizes == {(5, 5), (8, 6)}
+    for row in dataset:
+        assert len(row["board_state"]) == row["rows"] and len(row["board_state"][0]) == row["cols"]
+        assert row["prompt"][0]["content"] == build_system_prompt(row["rows"], row["cols"])
+
+    bucketed = loader.to_hf_dataset(seed=0, bucket_batch_size=4)
+    assert sorted(map(row_key, bucketed)) == sorted(map(row_key, dataset))
+    batches = [list(zip(bucketed["rows"], bucketed["cols"]))[i:i + 4] for i in range(0, len(bucketed), 4)]
+    # Every batch but the trailing leftovers has a single board size
+    mixed_batches = [batch for batch in batches if len(set(batch)) > 1]
+    assert len(mixed_batches) <= 1
@@ -0,0 +1,74 @@
+# tests/finetuning/encoders.py
+import numpy as np
+import pytest
+from src.finetuning.encoders import ENCODERS, FRONTIER_ENCODER, UNKNOWN_CELL, BoardEncoder, get_encoder
+from src.finetuning.prompt import build_system_prompt, format_example
+from src.minesweeper.minesweepersolver import MinesweeperSolver
+from src.minesweeper.validboard import ValidBoard
+from src.models import MinesweeperExample
+
+
+def solver_boards(rows, cols, mines, seed):
+    """
+    Every intermediate board of one solved game, as rows of strings.
+    """
+    vb = ValidBoard(rows=rows, cols=cols, mines=mines, rng=np.random.default_rng(seed))
+    vb.reveal(rows // 2, cols // 2)
+    boards = []
+    MinesweeperSolver(vb.board).solve(on_step=lambda step: boards.append([[str(cell) for cell in row] for row in vb.board.board]))
+    return boards
+
+
+@pytest.mark.parametrize("rows, cols, mines", [(5, 5, 6), (9, 12, 15)])
+def test_lossless_encoders_round_trip(rows, cols, mines):
+    for board in solver_boards(rows, cols, mines, seed=rows):
+        for encoder in ENCODERS.values():
+            decoded = encoder.decode(encoder.encode(board), rows, cols)
+            if encoder.lossless:
+                assert decoded == board
+            else:
+                # Whatever the sparse encoding lists is exact
+                assert all(
+                    d == UNKNOWN_CELL or d == b
+                    for d_row, b_row in zip(decoded, board)
+                    for d, b in zip(d_row, b_row)
+                )
+
+
+def test_frontier_lists_the_cells_next_to_numbers():
+    board = [
+        ["1", "*", "F"],
+        ["1", "2", "*"],
+        ["0", "1", "*"],
+    ]
+    encoder = get_encoder(FRONTIER_ENCODER)
+    assert "unrevealed: 3\n" in encoder.encode(board)  # the flag is not counted
+    assert encoder.decode(encoder.encode(board), 3, 3) == [
+        ["1", "*", "F"],
+        ["1", "2", "*"],
+        [UNKNOWN_CELL, "1", "*"],
+    ]
+
+
+def test_format_example_uses_encoder_and_matching_prompt():
+    board = [["1", "*"], ["*", "*"]]
+    example = MinesweeperExample(input="1 *\n* *\n\n", board_state=board, hidden_state=[["1", "M"], ["0", "1"]])
+    assert format_example(example)["prompt"][1]["content"] == example.input
+
+    prompt = format_example(example, "coordinates")["prompt"]
+    assert prompt[0]["content"] == build_system_prompt(2, 2, "coordinates")
+    assert prompt[1]["content"] == "1: 1*\n2: **\n"
+
+    with pytest.raises(ValueError):
+        get_encoder("unknown")
+
+
+def test_incomplete_encoder_cannot_be_instantiated():
+    class EncodeOnly(BoardEncoder):
+        name = "encode-only"
+
+        def encode(self, board):
+            return ""
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
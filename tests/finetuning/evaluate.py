@@ -0,0 +1,69 @@
+# tests/finetuning/evaluate.py
+from src.datagen.datagen import DataGenerator, FORMAT_SHARDS
+from src.finetuning import rewards
+from src.finetuning.dataset import MinesweeperDatasetLoader
+from src.finetuning.evaluate import GeneratorStats, evaluate, score_completions
+from src.finetuning.prompt import format_example
+from src.models import MinesweeperExample
+
+BOARD = [
+    ["1", "*", "*"],
+    ["1", "*", "*"],
+    ["*", "*", "*"],
+]
+HIDDEN = [
+    ["1", "M", "1"],
+    ["1", "1", "1"],
+    ["0", "0", "0"],
+]
+
+
+class SolverGenerator:
+    """
+    Stub generator that answers every prompt with the solver's move for it.
+    """
+
+    def __init__(self, examples):
+        self.answers = {format_example(ex)["prompt"][1]["content"]: ex.action for ex in examples}
+        self.calls = 0
+
+    def __call__(self, prompts):
+        self.calls += 1
+        return [self.answers[prompt[1]["content"]] for prompt in prompts]
+
+
+def test_score_completions(capsys):
+    example = MinesweeperExample(input="", board_state=BOARD, hidden_state=HIDDEN)
+    prompts = [format_example(example)["prompt"]] * 3
+    texts = ["row: 1, col: 2, action: flag", "row: 2, col: 2, action: flag", "flag the top"]
+    rewards.PRINTED_TIMES = 0
+
+    results = score_completions([example] * 3, prompts, texts)
+    assert results["mean_format"] == 2 / 3
+    assert results["mean_correct_move"] == 5.0 / 3
+    assert results["accuracy"] == 1 / 3
+    assert set(results) == {
+        "mean_format", "mean_valid_cell", "mean_logical_move", "mean_correct_move", "mean_safe_move", "accuracy",
+    }
+    # No reward hook debug output in the report
+    assert capsys.readouterr().out == ""
+
+
+def test_evaluate_with_stub_generator(tmp_path):
+    # Shards carry the solver's next move as each example's action
+    DataGenerator(str(tmp_path), seed=5, output_format=FORMAT_SHARDS).generate_games(num_games=2)
+    examples = MinesweeperDatasetLoader(str(tmp_path)).load_examples(shuffle=False)
+    generator = SolverGenerator(examples)
+
+    results = evaluate(generator, data_dir=str(tmp_path), limit=5)
+    assert generator.calls == 1
+    assert results["examples"] == 5
+    assert results["mean_format"] == 1.0 and results["accuracy"] == 1.0
+    assert "peak_rss_mb" in results
+    # Without GeneratorStats there are no token rates or batch latencies
+    assert "generated_tokens_per_s" not in results
+
+    generator.stats = GeneratorStats(batch_latencies=[0.5, 1.5], generated_tokens=40)
+    results = evaluate(generator, data_dir=str(tmp_path), limit=5)
+    assert results["generated_tokens_per_s"] == 20.0
+    assert results["batch_latency_p50_ms"] == 1000.0
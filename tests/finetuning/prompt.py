@@ -0,0 +1,42 @@
+# tests/finetuning/prompt.py
+from src.finetuning.prompt import PromptTokenizer, build_system_prompt
+
+
+class CharTokenizer:
+    """
+    Character-level tokenizer with a ChatML-style template, counting template renders.
+    """
+
+    def __init__(self):
+        self.renders = 0
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False, **kwargs):
+        self.renders += 1
+        text = "".join(f"<|{m['role']}|>\n{m['content']}<|end|>\n" for m in messages)
+        return text + ("<|assistant|>\n" if add_generation_prompt else "")
+
+    def __call__(self, text, add_special_tokens=True):
+        return {"input_ids": [ord(ch) for ch in text]}
+
+
+def full_ids(tokenizer, messages):
+    return tokenizer(tokenizer.apply_chat_template(messages, add_generation_prompt=True))["input_ids"]
+
+
+def test_prompt_tokenizer_matches_full_tokenization():
+    tokenizer = CharTokenizer()
+    prompt_tokenizer = PromptTokenizer(tokenizer)
+    prompts = [
+        [{"role": "system", "content": build_system_prompt(rows, cols)}, {"role": "user", "content": board}]
+        for rows, cols in [(5, 5), (8, 8)]
+        for board in ["* 1\nF 2\n", "1 1\n* *\n", "\n* *\n"]
+    ]
+    encoded = prompt_tokenizer.encode_batch(prompts)
+
+    renders = tokenizer.renders
+    assert encoded == [full_ids(tokenizer, messages) for messages in prompts]
+    # Two system prompts rendered once each, plus the leading-newline fallback for each of them
+    assert renders == 4
+    assert prompt_tokenizer.prefix_length(build_system_prompt(5, 5)) == len(
+        f"<|system|>\n{build_system_prompt(5, 5)}<|end|>\n<|user|>\n"
+    )
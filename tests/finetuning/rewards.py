@@ -0,0 +1,131 @@
+# tests/finetuning/rewards.py
+from src.finetuning import rewards
+from src.finetuning.rewards import (
+    reward_correct_move,
+    reward_format_correct,
+    reward_logical_move,
+    reward_safe_move,
+    reward_valid_cell,
+    parse_move,
+    score_batch,
+)
+
+BOARD = [
+    ["1", "*", "*"],
+    ["1", "*", "*"],
+    ["*", "*", "*"],
+]
+HIDDEN = [
+    ["1", "M", "1"],
+    ["1", "1", "1"],
+    ["0", "0", "0"],
+]
+SMALL_BOARD = [
+    ["*", "*"],
+    ["F", "1"],
+]
+SMALL_HIDDEN = [
+    ["0", "1"],
+    ["M", "1"],
+]
+
+
+def completion(text):
+    return [{"role": "assistant", "content": text}]
+
+
+def score_all(completions, board_state, hidden_state):
+    prompts = [[{"role": "user", "content": "board"}]] * len(completions)
+    return (
+        reward_format_correct(completions),
+        reward_valid_cell(completions, board_state, hidden_state=hidden_state),
+        reward_logical_move(prompts, completions, board_state, hidden_state),
+        reward_correct_move(prompts, completions, board_state, hidden_state),
+    )
+
+
+def test_reward_components():
+    moves = [
+        "row: 1, col: 2, action: flag",    # mine next to two numbers
+        "row: 1, col: 2, action: reveal",  # same cell, wrong action
+        "row: 2, col: 2, action: reveal",  # safe, three revealed neighbors
+        "row: 3, col: 3, action: reveal",  # safe but no revealed neighbor
+        "row: 1, col: 1, action: reveal",  # already revealed
+        "row: 4, col: 1, action: reveal",  # out of bounds
+        "reveal the top left",             # unparsable
+        "row: 1, col: 1, action: reveal",  # 2x2 board: hidden, next to F and 1
+        "row: 1, col: 2, action: flag",    # 2x2 board: safe cell flagged
+    ]
+    completions = [completion(m) for m in moves]
+    board_state = [BOARD] * 7 + [SMALL_BOARD] * 2
+    hidden_state = [HIDDEN] * 7 + [SMALL_HIDDEN] * 2
+
+    formats, valid, logical, correct = score_all(completions, board_state, hidden_state)
+    assert formats == [1.0] * 6 + [0.0] + [1.0] * 2
+    assert valid == [2.0, 2.0, 2.0, 2.0, 0.0, 0.0, 0.0, 2.0, 2.0]
+    assert logical == [2.0, 2.0, 2.0, 0.0, 0.0, 0.0, 0.0, 2.0, 2.0]
+    assert correct == [5.0, 0.0, 5.0, 0.0, 0.0, 0.0, 0.0, 5.0, 0.0]
+
+
+def test_batch_is_scored_once(monkeypatch):
+    calls = []
+    compute = rewards._compute_batch
+    monkeypatch.setattr(rewards, "_compute_batch", lambda *args: calls.append(1) or compute(*args))
+
+    completions = [completion("row: 2, col: 2, action: reveal")]
+    board_state, hidden_state = [BOARD], [HIDDEN]
+    score_all(completions, board_state, hidden_state)
+    assert len(calls) == 1
+
+    # A new batch with equal contents is a different batch
+    score_all([completion("row: 2, col: 2, action: reveal")], board_state, hidden_state)
+    assert len(calls) == 2
+    assert score_batch(completions, board_state, hidden_state).correct_move.tolist() == [5.0]
+
+
+def test_batch_is_scored_once_with_rebuilt_board_lists(monkeypatch):
+    calls = []
+    compute = rewards._compute_batch
+    monkeypatch.setattr(rewards, "_compute_batch", lambda *args: calls.append(1) or compute(*args))
+
+    # TRL builds fresh board_state/hidden_state lists for every reward function
+    completions = [completion("row: 2, col: 2, action: reveal"), completion("row: 1, col: 2, action: flag")]
+    prompts = [[{"role": "user", "content": "board"}]] * 2
+    valid = reward_valid_cell(completions, [BOARD, BOARD], hidden_state=[HIDDEN, HIDDEN])
+    correct = reward_correct_move(prompts, completions, [BOARD, BOARD], [HIDDEN, HIDDEN])
+    assert len(calls) == 1
+    assert valid == [2.0, 2.0]
+    assert correct == [5.0, 5.0]
+
+
+def test_think_tags_are_ignored():
+    assert parse_move("<think>row: 9, col: 9, action: flag?</think>\nrow: 2, col: 3, action: reveal") == (1, 2, "reveal")
+    assert parse_move("no, row 1 is risky</think> row: 1, col: 1, action: flag") == (0, 0, "flag")
+    assert parse_move("<think>row: 2, col: 3, action: reveal") == (None, None, None)
+
+
+def test_completions_are_parsed_once_per_batch(monkeypatch):
+    calls = []
+    parse = rewards.parse_move
+    monkeypatch.setattr(rewards, "parse_move", lambda text: calls.append(text) or parse(text))
+
+    completions = [completion("row: 2, col: 2, action: reveal"), completion("row: 1, col: 2, action: flag")]
+    score_all(completions, [BOARD] * 2, [HIDDEN] * 2)
+    assert len(calls) == 2
+
+
+def test_safe_move_rewards_deductions_over_guesses():
+    moves = [
+        "row: 3, col: 3, action: reveal",  # provably safe: the only mine touches both 1s
+        "row: 1, col: 2, action: flag",    # the mine, but (2, 2) is equally likely
+        "row: 2, col: 2, action: reveal",  # 50% guess
+        "row: 3, col: 1, action: flag",    # provably safe cell flagged
+        "row: 1, col: 1, action: reveal",  # already revealed
+    ]
+    completions = [completion(m) for m in moves]
+    prompts = [[{"role": "user", "content": "board"}]] * len(moves)
+    rewards.mine_probabilities.cache_clear()
+    scores = reward_safe_move(prompts, completions, [BOARD] * len(moves), [HIDDEN] * len(moves))
+    assert scores == [5.0, 1.0, 1.0, 0.0, 0.0]
+    # One board, computed once
+    assert rewards.mine_probabilities.cache_info().misses == 1
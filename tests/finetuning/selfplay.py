@@ -0,0 +1,68 @@
+# tests/finetuning/selfplay.py
+from src.finetuning import selfplay
+from src.finetuning.prompt import format_move
+from src.finetuning.selfplay import GAME_LOST, GAME_SKIPPED, GAME_STALLED, GAME_WON, play_games
+
+
+def board_from_prompt(prompt):
+    return [line.split() for line in prompt[1]["content"].splitlines() if line.strip()]
+
+
+def test_games_are_batched_and_retired(monkeypatch):
+    # Track the hidden boards so that an oracle player can always make a safe move
+    games = []
+    original_init = selfplay.SelfPlayGame.__init__
+
+    def tracked_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        games.append(self)
+
+    monkeypatch.setattr(selfplay.SelfPlayGame, "__init__", tracked_init)
+    batch_sizes = []
+
+    def oracle(prompts):
+        batch_sizes.append(len(prompts))
+        in_flight = [game for game in games if game.result is None]
+        answers = []
+        for game, prompt in zip(in_flight, prompts):
+            board = game.valid_board.board
+            assert board_from_prompt(prompt) == [[str(cell) for cell in row] for row in board.board]
+            r, c = next(
+                (r, c) for r in range(board.rows) for c in range(board.cols)
+                if board.board[r][c] == "*" and board.hidden_board[r][c] != "M"
+            )
+            answers.append(format_move(r, c, "reveal"))
+        return answers
+
+    stats = play_games(oracle, num_games=10, concurrency=4, seed=0)
+    assert stats.games == 10
+    assert stats.results[GAME_WON] == 10 and stats.win_rate == 1.0
+    assert max(batch_sizes) == 4
+    assert stats.moves == sum(batch_sizes)
+    assert len(stats.turn_latencies) == len(batch_sizes)
+
+
+def test_unusable_answers_stall_and_mines_lose():
+    stats = play_games(lambda prompts: ["I give up"] * len(prompts), num_games=3, concurrency=2, seed=1)
+    assert stats.results[GAME_STALLED] == 3
+    assert stats.invalid_moves == 3 * selfplay.MAX_INVALID_MOVES
+
+    def reveal_first_hidden(prompts):
+        answers = []
+        for prompt in prompts:
+            board = board_from_prompt(prompt)
+            r, c = next((r, c) for r, row in enumerate(board) for c, cell in enumerate(row) if cell == "*")
+            answers.append(format_move(r, c, "reveal"))
+        return answers
+
+    stats = play_games(reveal_first_hidden, num_games=5, seed=2)
+    assert stats.results[GAME_LOST] + stats.results[GAME_WON] == 5
+    assert stats.results[GAME_LOST] > 0
+
+
+def test_games_without_a_valid_board_are_skipped():
+    # 14 mines never fit outside the first click's neighborhood on a 4x4 board
+    stats = play_games(lambda prompts: ["I give up"] * len(prompts), num_games=3, rows=4, cols=4,
+                       min_mines=14, max_mines=14, seed=0)
+    assert stats.games == 3 and stats.results[GAME_SKIPPED] == 3
+    assert stats.played == 0 and stats.win_rate == 0.0
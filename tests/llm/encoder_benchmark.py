@@ -0,0 +1,55 @@
+import numpy as np
+from transformers import AutoTokenizer
+
+from src.finetuning.encoders import ENCODERS
+from src.finetuning.prompt import build_system_prompt
+from src.minesweeper.minesweepersolver import MinesweeperSolver
+from src.minesweeper.validboard import ValidBoard
+
+model_name = "unsloth/Qwen3-0.6B"
+board_sizes = [5, 8, 10, 12, 16]
+games_per_size = 5
+mine_density = 0.15
+
+tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+
+def sample_boards(size: int, rng: np.random.Generator):
+    """
+    Intermediate boards of a few solved games (every solver step).
+    """
+    boards = []
+    for _ in range(games_per_size):
+        vb = ValidBoard(rows=size, cols=size, mines=max(1, int(size * size * mine_density)), rng=rng)
+        vb.reveal(int(rng.integers(size)), int(rng.integers(size)))
+        MinesweeperSolver(vb.board).solve(
+            on_step=lambda step: boards.append([[str(cell) for cell in row] for row in vb.board.board])
+        )
+    return boards
+
+
+def count_tokens(text: str) -> int:
+    return len(tokenizer(text, add_special_tokens=False).input_ids)
+
+
+rng = np.random.default_rng(0)
+print(f"Average tokens per prompt ({model_name}), board message / full chat prompt")
+print(f"{'size':>6} " + " ".join(f"{name:>22}" for name in ENCODERS))
+for size in board_sizes:
+    boards = sample_boards(size, rng)
+    cells = []
+    for name, encoder in ENCODERS.items():
+        board_tokens = [count_tokens(encoder.encode(board)) for board in boards]
+        # Full prompts over the same boards, so both columns are averages of the same set
+        prompt_tokens = [
+            count_tokens(tokenizer.apply_chat_template(
+                [
+                    {"role": "system", "content": build_system_prompt(size, size, name)},
+                    {"role": "user", "content": encoder.encode(board)},
+                ],
+                tokenize=False, add_generation_prompt=True, enable_thinking=False,
+            ))
+            for board in boards
+        ]
+        cells.append(f"{np.mean(board_tokens):>10.1f} / {np.mean(prompt_tokens):>9.1f}")
+    print(f"{size:>3}x{size:<2} " + " ".join(f"{cell:>22}" for cell in cells))
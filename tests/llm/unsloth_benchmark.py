@@ -1,5 +1,10 @@
 from unsloth import FastLanguageModel
-from src.finetuning.prompt import SYSTEM_PROMPT
+from src.finetuning.prompt import SYSTEM_PROMPT, PromptTokenizer
+from src.minesweeper.board import format_board
+from src.minesweeper.validboard import ValidBoard
+from vllm import SamplingParams
+import numpy as np
+import time
 import torch
 
 max_seq_length = 2048  # Can increase for longer reasoning traces
@@ -30,25 +35,19 @@ F 1 0 0 1 * * *
 """}
 ]
 
-# Apply chat template, enabling thinking mode
-text = tokenizer.apply_chat_template(
-    messages,
-    tokenize=False,
-    add_generation_prompt=True,
-    enable_thinking=False   # key part for <think> sections
-)
-
-# Tokenize input
-inputs = tokenizer([text], return_tensors="pt").to(model.device)
+# Tokenize with the chat template (thinking disabled); the system prompt prefix is tokenized once
+prompt_tokenizer = PromptTokenizer(tokenizer, enable_thinking=False)
+input_ids = torch.tensor([prompt_tokenizer.encode(messages)], device=model.device)
 
 # Generate
 generated_ids = model.generate(
-    **inputs,
+    input_ids=input_ids,
+    attention_mask=torch.ones_like(input_ids),
     max_new_tokens=512,
 )
 
 # Extract only the new tokens
-output_ids = generated_ids[0][len(inputs.input_ids[0]):].tolist()
+output_ids = generated_ids[0][len(input_ids[0]):].tolist()
 
 # Parse out thinking vs final content
 try:
@@ -62,3 +61,50 @@ content = tokenizer.decode(output_ids, skip_special_tokens=True).strip("\n")
 
 # print("thinking content:", thinking_content)
 print("content:\n", content)
+
+
+# ---- Prefix caching in the vLLM engine ----
+# A GRPO group is `group_size` completions of prompts that share the system prompt. With prefix
+# caching on, vLLM reuses the KV blocks of that shared prefix instead of recomputing them.
+# This is the engine that fast_inference=True built for training (model.vllm_engine).
+group_size = 8
+llm = model.vllm_engine
+assert llm.llm_engine.cache_config.enable_prefix_caching, "Prefix caching is off in the unsloth vLLM engine"
+
+
+def random_boards(n: int, rng: np.random.Generator):
+    boards = []
+    for _ in range(n):
+        vb = ValidBoard(rows=8, cols=8, mines=10, rng=rng)
+        vb.reveal(int(rng.integers(8)), int(rng.integers(8)))
+        boards.append(format_board(vb.board.board))
+    return boards
+
+
+def prefill_time(board: str, cold: bool) -> float:
+    """
+    Time to process one prompt with a single output token (prefill dominated).
+    cold: clear the prefix cache first, so nothing of the prompt is cached.
+    """
+    prompt = {"prompt_token_ids": prompt_tokenizer.encode([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": board},
+    ])}
+    if cold:
+        llm.reset_prefix_cache()
+    start = time.perf_counter()
+    model.fast_generate([prompt], sampling_params=SamplingParams(max_tokens=1), use_tqdm=False)
+    return time.perf_counter() - start
+
+
+rng = np.random.default_rng(0)
+for board in random_boards(2, rng):
+    prefill_time(board, cold=True)  # warm up the engine
+# One prompt at a time, so each cold prompt really starts from an empty cache
+cold = sum(prefill_time(board, cold=True) for board in random_boards(group_size, rng))
+prefill_time(random_boards(1, rng)[0], cold=True)  # cache the system prompt
+warm = sum(prefill_time(board, cold=False) for board in random_boards(group_size, rng))  # new boards, cached prefix
+prefix_tokens = prompt_tokenizer.prefix_length(SYSTEM_PROMPT)
+print(f"Shared prefix: {prefix_tokens} tokens")
+print(f"Prefill for {group_size} prompts: cold cache {cold * 1000:.1f} ms, warm cache {warm * 1000:.1f} ms "
+      f"({(cold - warm) * 1000:.1f} ms saved)")
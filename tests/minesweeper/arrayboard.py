@@ -0,0 +1,79 @@
+# tests/minesweeper/arrayboard.py
+import numpy as np
+import pytest
+from src.minesweeper.board import Board
+from src.minesweeper.arrayboard import ArrayBoard, CellState, MINE
+
+
+def test_neighbor_counts_match_list_board():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        array_board = ArrayBoard(rows=9, cols=7, mines=15, rng=rng)
+        array_board.generate_random_board()
+        assert np.count_nonzero(array_board.hidden == MINE) == 15
+
+        board = array_board.to_board()
+        for r in range(board.rows):
+            for c in range(board.cols):
+                if board.hidden_board[r][c] == "M":
+                    continue
+                expected = sum(
+                    board.hidden_board[nr][nc] == "M"
+                    for nr in range(max(0, r - 1), min(board.rows, r + 2))
+                    for nc in range(max(0, c - 1), min(board.cols, c + 2))
+                )
+                assert board.hidden_board[r][c] == expected
+
+
+def test_reveal_matches_list_board():
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        array_board = ArrayBoard(rows=8, cols=8, mines=8, rng=rng)
+        array_board.generate_random_board()
+        board = array_board.to_board()
+
+        # Flag a couple of cells first so the flood fill has to respect them
+        for r, c in [(2, 2), (5, 1)]:
+            array_board.flag(r, c)
+            board.flag(r, c)
+
+        for r, c in [(0, 0), (7, 7), (3, 4)]:
+            assert array_board.reveal(r, c) == board.reveal(r, c)
+            assert array_board.to_board().board == board.board
+        assert array_board.check_win() == board.check_win()
+
+
+def test_round_trip_and_flag_toggle():
+    board = Board(rows=5, cols=5, mines=4)
+    board.generate_random_board()
+    board.reveal(2, 2)
+
+    array_board = ArrayBoard.from_board(board)
+    assert array_board.to_board().board == board.board
+    assert array_board.to_board().hidden_board == board.hidden_board
+
+    hidden = list(zip(*np.nonzero(array_board.state == CellState.HIDDEN)))
+    if hidden:
+        r, c = hidden[0]
+        array_board.flag(r, c)
+        assert array_board.state[r, c] == CellState.FLAGGED
+        array_board.flag(r, c)
+        assert array_board.state[r, c] == CellState.HIDDEN
+
+
+def test_too_many_mines():
+    with pytest.raises(ValueError):
+        ArrayBoard(rows=3, cols=3, mines=9)
+
+
+def test_safe_cell_generation_reveals_zero():
+    rng = np.random.default_rng(2)
+    for r, c in [(0, 0), (4, 4), (2, 3)]:
+        array_board = ArrayBoard(rows=5, cols=5, mines=8, rng=rng)
+        array_board.generate_random_board(safe_cell=(r, c))
+        assert array_board.hidden[r, c] == 0
+
+        board = Board(rows=5, cols=5, mines=8)
+        board.generate_random_board(safe_cell=(r, c))
+        assert board.hidden_board[r][c] == 0
+        assert sum(cell == "M" for row in board.hidden_board for cell in row) == 8
@@ -0,0 +1,20 @@
+# tests/minesweeper/batchgenerator.py
+import numpy as np
+from src.minesweeper.arrayboard import MINE
+from src.minesweeper.batchgenerator import generate_candidate_boards, generate_valid_boards
+from src.minesweeper.minesweepersolver import MinesweeperSolver
+
+
+def test_candidate_boards_have_exact_mine_count():
+    hidden = generate_candidate_boards(256, 6, 7, 9, np.random.default_rng(0))
+    assert hidden.shape == (256, 6, 7)
+    assert (np.count_nonzero(hidden == MINE, axis=(1, 2)) == 9).all()
+
+
+def test_generate_valid_boards():
+    boards = generate_valid_boards(5, 8, 8, 10, first_click=(3, 3), rng=np.random.default_rng(0), batch_size=128)
+    assert len(boards) == 5
+    for board in boards:
+        assert board.hidden_board[3][3] == 0, "First click should be a 0"
+        assert board.board[3][3] == "0", "First click should already be revealed"
+        assert MinesweeperSolver(board).is_solvable() is True
@@ -0,0 +1,95 @@
+# tests/minesweeper/bitboard.py
+import sys
+import numpy as np
+import pytest
+from src.minesweeper.arrayboard import ArrayBoard
+from src.minesweeper.bitboard import BitBoard
+from src.minesweeper.board import format_board
+
+
+def played_boards(seed, count=30):
+    """
+    Partially played boards: a few reveals and flags on random 9x7 boards.
+    """
+    rng = np.random.default_rng(seed)
+    boards = []
+    for _ in range(count):
+        array_board = ArrayBoard(rows=9, cols=7, mines=12, rng=rng)
+        array_board.generate_random_board()
+        board = array_board.to_board()
+        for _ in range(4):
+            r, c = int(rng.integers(9)), int(rng.integers(7))
+            if rng.random() < 0.3:
+                board.flag(r, c)
+            else:
+                board.reveal(r, c)
+        boards.append(board)
+    return boards
+
+
+def test_round_trips_are_lossless():
+    for board in played_boards(0):
+        bitboard = BitBoard.from_board(board)
+        assert bitboard.mines == board.mines
+        assert bitboard.to_board().board == board.board
+        assert bitboard.to_board().hidden_board == board.hidden_board
+
+        board_state, hidden_state = bitboard.to_lists()
+        assert BitBoard.from_lists(board_state, hidden_state) == bitboard
+        assert bitboard.to_text() == board.to_text()
+        assert BitBoard.from_text(board.to_text() + "\n", format_board(board.hidden_board)) == bitboard
+        assert bitboard.check_win() == board.check_win()
+
+
+def test_flags_and_hashing():
+    board = played_boards(1, count=1)[0]
+    bitboard = BitBoard.from_board(board)
+    r, c = next((r, c) for r in range(board.rows) for c in range(board.cols) if board.board[r][c] == "*")
+    bitboard.flag(r, c)
+    board.flag(r, c)
+    assert bitboard.cell(r, c) == "F"
+    assert bitboard.to_board().board == board.board
+    assert len({bitboard, BitBoard.from_board(board)}) == 1
+
+
+def test_inconsistent_lists_are_rejected():
+    with pytest.raises(ValueError):
+        BitBoard.from_lists([["1", "*"], ["*", "*"]], [["2", "M"], ["1", "1"]])
+    with pytest.raises(ValueError):
+        BitBoard.from_lists([["0", "*"], ["*", "*"]], [["1", "M"], ["1", "1"]])
+
+
+def test_bitboard_is_smaller_than_board():
+    board = played_boards(2, count=1)[0]
+    bitboard = BitBoard.from_board(board)
+    bitboard_size = sys.getsizeof(bitboard) + sum(
+        sys.getsizeof(getattr(bitboard, name)) for name in BitBoard.__slots__
+    )
+    board_size = sum(sys.getsizeof(row) for row in board.board + board.hidden_board)
+    assert bitboard_size * 4 < board_size
+
+
+def test_reveal_matches_list_board():
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        rows, cols = int(rng.integers(2, 12)), int(rng.integers(2, 12))
+        array_board = ArrayBoard(rows=rows, cols=cols, mines=int(rng.integers(1, rows * cols // 4 + 2)), rng=rng)
+        array_board.generate_random_board()
+        board = array_board.to_board()
+        bitboard = BitBoard.from_board(board)
+
+        # Random flags and reveals, so the flood fill meets flags and revealed regions
+        for _ in range(8):
+            r, c = int(rng.integers(rows)), int(rng.integers(cols))
+            if rng.random() < 0.3:
+                board.flag(r, c)
+                bitboard.flag(r, c)
+                continue
+            before = [row[:] for row in board.board]
+            alive = board.reveal(r, c)
+            expected = {(rr, cc) for rr in range(rows) for cc in range(cols) if board.board[rr][cc] != before[rr][cc]}
+            before_mask = bitboard.revealed_mask
+            assert bitboard.reveal(r, c) == alive
+            assert set(bitboard.cells(bitboard.revealed_mask & ~before_mask)) == expected
+            assert bitboard.to_board().board == board.board
+        assert bitboard.check_win() == board.check_win()
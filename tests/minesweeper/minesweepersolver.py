@@ -0,0 +1,83 @@
+# tests/minesweeper/minesweepersolver.py
+import numpy as np
+from src.minesweeper.arrayboard import ArrayBoard
+from src.minesweeper.board import Board
+from src.minesweeper.minesweepersolver import MinesweeperSolver, SolverTier, SolverStep
+
+
+def test_solver_only_flags_mines_and_verdict_matches_board():
+    rng = np.random.default_rng(0)
+    for rows, cols, mines in [(5, 5, 6), (8, 8, 10), (16, 30, 60)]:
+        for _ in range(30):
+            array_board = ArrayBoard(rows, cols, mines, rng=rng)
+            array_board.generate_random_board(safe_cell=(rows // 2, cols // 2))
+            array_board.reveal(rows // 2, cols // 2)
+            board = array_board.to_board()
+
+            solved = MinesweeperSolver(board).solve()
+            assert solved == board.check_win()
+            for r in range(rows):
+                for c in range(cols):
+                    assert board.board[r][c] != "M", "Solver must never reveal a mine"
+                    if board.board[r][c] == "F":
+                        assert board.hidden_board[r][c] == "M", f"Flag at ({r},{c}) is not a mine!"
+
+
+def test_subset_tier_solves_overlapping_constraints():
+    # Bottom row "1 1 2 1": the single-cell rules are stuck, the pair-wise rule is not
+    hidden = [
+        [1, "M", 2, "M"],
+        [1, 1, 2, 1],
+    ]
+    board_data = [
+        ["*", "*", "*", "*"],
+        ["1", "1", "2", "1"],
+    ]
+    basic = Board(rows=2, cols=4, mines=2, board_data=board_data, hidden_data=hidden)
+    assert MinesweeperSolver(basic).solve(tier=SolverTier.BASIC) is False
+
+    subset = Board(rows=2, cols=4, mines=2, board_data=board_data, hidden_data=hidden)
+    assert MinesweeperSolver(subset).solve(tier=SolverTier.SUBSET) is True
+    assert subset.board[0] == ["1", "F", "2", "F"]
+
+
+def test_higher_tiers_solve_a_superset():
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        array_board = ArrayBoard(8, 8, 12, rng=rng)
+        array_board.generate_random_board(safe_cell=(4, 4))
+        array_board.reveal(4, 4)
+
+        previous = False
+        for tier in SolverTier:
+            board = array_board.to_board()
+            solved = MinesweeperSolver(board).solve(tier=tier)
+            assert solved or not previous, "A higher tier must solve every board a lower tier solves"
+            previous = solved
+            for r in range(8):
+                for c in range(8):
+                    if board.board[r][c] == "F":
+                        assert board.hidden_board[r][c] == "M"
+
+
+def test_on_step_reports_every_move():
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        array_board = ArrayBoard(8, 8, 10, rng=rng)
+        array_board.generate_random_board(safe_cell=(0, 0))
+        array_board.reveal(0, 0)
+        board = array_board.to_board()
+        replay = array_board.to_board()
+
+        steps = []
+        MinesweeperSolver(board).solve(tier=SolverTier.SUBSET, on_step=steps.append)
+
+        # Replaying the reported moves must reproduce the solved board exactly
+        for step in steps:
+            assert isinstance(step, SolverStep)
+            if step.action == "reveal":
+                assert replay.reveal_cells(step.row, step.col) == step.revealed
+            else:
+                assert step.action == "flag" and step.revealed == []
+                replay.flag(step.row, step.col)
+        assert replay.board == board.board
@@ -0,0 +1,67 @@
+# tests/minesweeper/probability.py
+import itertools
+import numpy as np
+from src.minesweeper.arrayboard import ArrayBoard
+from src.minesweeper.probability import MineProbability
+
+
+def brute_force_probabilities(board):
+    """
+    P(mine) for every hidden cell by enumerating every placement of the remaining mines.
+    """
+    cells = [(r, c) for r in range(board.rows) for c in range(board.cols)]
+    hidden = [(r, c) for r, c in cells if board.board[r][c] == "*"]
+    flags = {(r, c) for r, c in cells if board.board[r][c] == "F"}
+    counts = {cell: 0 for cell in hidden}
+    total = 0
+    for combo in itertools.combinations(hidden, board.mines - len(flags)):
+        mines = set(combo) | flags
+        consistent = all(
+            board.board[r][c] in ("*", "F")
+            or sum((nr, nc) in mines for nr in range(r - 1, r + 2) for nc in range(c - 1, c + 2)) == int(board.board[r][c])
+            for r, c in cells
+        )
+        if consistent:
+            total += 1
+            for cell in combo:
+                counts[cell] += 1
+    return {cell: count / total for cell, count in counts.items()}
+
+
+def test_probabilities_match_brute_force():
+    rng = np.random.default_rng(0)
+    for i in range(30):
+        array_board = ArrayBoard(5, 5, 6, rng=rng)
+        array_board.generate_random_board(safe_cell=(2, 2))
+        array_board.reveal(2, 2)
+        board = array_board.to_board()
+        if i % 2:
+            for r, c in zip(*np.nonzero(array_board.hidden == -1)):
+                if rng.random() < 0.3:
+                    board.flag(r, c)
+
+        probs = MineProbability(board).probabilities()
+        for (r, c), expected in brute_force_probabilities(board).items():
+            assert abs(probs[r][c] - expected) < 1e-12
+        for r in range(5):
+            for c in range(5):
+                if board.board[r][c] == "F":
+                    assert probs[r][c] == 1.0
+                elif board.board[r][c] != "*":
+                    assert probs[r][c] == 0.0
+
+
+def test_safest_cell_is_never_a_forced_mine():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        array_board = ArrayBoard(16, 30, 99, rng=rng)
+        array_board.generate_random_board(safe_cell=(8, 15))
+        array_board.reveal(8, 15)
+        board = array_board.to_board()
+
+        mine_probability = MineProbability(board)
+        probs = mine_probability.probabilities()
+        assert abs(sum(map(sum, probs)) - 99) < 1e-6, "Probabilities must add up to the mine count"
+        r, c = mine_probability.safest_cell()
+        assert board.board[r][c] == "*"
+        assert probs[r][c] == min(probs[hr][hc] for hr in range(16) for hc in range(30) if board.board[hr][hc] == "*")
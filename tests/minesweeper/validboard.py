@@ -1,6 +1,8 @@
 # tests/minesweeper/validboard.py
 import pytest
-from src.minesweeper.validboard import ValidBoard
+from src.minesweeper.validboard import (
+    ValidBoard, BoardGenerationError, REJECT_MINE_AT_CLICK, REJECT_NON_ZERO, REJECT_UNSOLVABLE
+)
 
 
 def test_first_move_reveals_zero_and_board_is_solvable():
@@ -45,3 +47,43 @@ def test_reveal_updates_board_and_check_win():
 
     # Now check_win should return True
     assert vb.check_win() is True, "Board should be won after revealing all non-mine squares"
+
+
+def test_safe_first_click_only_rejects_unsolvable_boards():
+    # Dense board: 5x5 with 8 mines rejects most unconstrained candidates
+    for r, c in [(0, 0), (2, 2), (4, 1)]:
+        vb = ValidBoard(rows=5, cols=5, mines=8)
+        vb.reveal(r, c)
+        assert vb.board.hidden_board[r][c] == 0
+        assert vb.stats.accepted == 1
+        assert 0.0 < vb.stats.acceptance_rate <= 1.0
+        assert vb.stats.rejections[REJECT_NON_ZERO] == 0
+        assert vb.stats.rejections[REJECT_MINE_AT_CLICK] == 0
+        # Wall time covers the stages plus the loop around them
+        assert 0.0 < vb.stats.stage_time <= vb.stats.wall_time
+
+
+def test_safe_first_click_rejects_impossible_density():
+    vb = ValidBoard(rows=3, cols=3, mines=1)
+    with pytest.raises(ValueError):
+        vb.reveal(1, 1)
+
+
+def test_attempt_budget_raises_with_stats():
+    # Unconstrained and extremely dense: almost every candidate is rejected
+    vb = ValidBoard(rows=5, cols=5, mines=20, safe_first_click=False, max_attempts=50)
+    with pytest.raises(BoardGenerationError) as exc_info:
+        vb.reveal(2, 2)
+
+    stats = exc_info.value.stats
+    assert stats.attempts == 50
+    assert stats.accepted == 0
+    assert sum(stats.rejections.values()) == 50
+    assert stats.rejections[REJECT_MINE_AT_CLICK] + stats.rejections[REJECT_NON_ZERO] > 0
+    assert vb.board is None
+
+
+def test_deadline_raises():
+    vb = ValidBoard(rows=5, cols=5, mines=20, safe_first_click=False, max_attempts=None, deadline=0.05)
+    with pytest.raises(BoardGenerationError):
+        vb.reveal(2, 2)
@@ -0,0 +1,74 @@
+# tests/server/app.py
+import pytest
+from fastapi.testclient import TestClient
+from src.server.app import STATUS_LOST, STATUS_PLAYING, STATUS_WON, create_app
+
+
+@pytest.fixture
+def client():
+    with TestClient(create_app(max_sessions=3, idle_timeout=60)) as client:
+        yield client
+
+
+def play_safely(client, game):
+    """
+    Reveal every safe cell of a started game, using the hidden board to pick them.
+    """
+    game_id = game["game_id"]
+    hidden = client.app.state.store.sessions[game_id].valid_board.board.hidden_board
+    while game["status"] == STATUS_PLAYING:
+        r, c = next(
+            (r, c) for r, row in enumerate(game["board"]) for c, cell in enumerate(row)
+            if cell == "*" and hidden[r][c] != "M"
+        )
+        game = client.post(f"/games/{game_id}/reveal", json={"row": r, "col": c}).json()
+    return game
+
+
+def test_game_lifecycle(client):
+    game = client.post("/games", json={"rows": 5, "cols": 6, "mines": 5, "seed": 0}).json()
+    assert game["status"] == STATUS_PLAYING and game["board"] == [["*"] * 6 for _ in range(5)]
+    game_id = game["game_id"]
+
+    # Flags need a board, which only exists after the first reveal
+    assert client.post(f"/games/{game_id}/flag", json={"row": 1, "col": 1}).status_code == 409
+    game = client.post(f"/games/{game_id}/reveal", json={"row": 2, "col": 2}).json()
+    assert game["board"][2][2] == "0"
+
+    hidden_cell = next((r, c) for r, row in enumerate(game["board"]) for c, cell in enumerate(row) if cell == "*")
+    flagged = client.post(f"/games/{game_id}/flag", json={"row": hidden_cell[0], "col": hidden_cell[1]}).json()
+    assert flagged["board"][hidden_cell[0]][hidden_cell[1]] == "F"
+    assert client.get(f"/games/{game_id}").json() == flagged
+
+    client.post(f"/games/{game_id}/flag", json={"row": hidden_cell[0], "col": hidden_cell[1]})
+    finished = play_safely(client, client.get(f"/games/{game_id}").json())
+    assert finished["status"] == STATUS_WON and "hidden" in finished
+    assert client.post(f"/games/{game_id}/reveal", json={"row": 0, "col": 0}).status_code == 409
+
+    assert client.delete(f"/games/{game_id}").status_code == 200
+    assert client.get(f"/games/{game_id}").status_code == 404
+
+
+def test_hitting_a_mine_ends_the_game(client):
+    game = client.post("/games", json={"rows": 5, "cols": 5, "mines": 6, "seed": 1}).json()
+    game_id = game["game_id"]
+    client.post(f"/games/{game_id}/reveal", json={"row": 2, "col": 2})
+    hidden = client.app.state.store.sessions[game_id].valid_board.board.hidden_board
+    r, c = next((r, c) for r, row in enumerate(hidden) for c, cell in enumerate(row) if cell == "M")
+    assert client.post(f"/games/{game_id}/reveal", json={"row": r, "col": c}).json()["status"] == STATUS_LOST
+
+
+def test_bounds_and_session_limits(client):
+    assert client.post("/games", json={"rows": 64, "cols": 8, "mines": 10}).status_code == 422
+    assert client.post("/games", json={"rows": 3, "cols": 3, "mines": 9}).status_code == 422
+
+    game_ids = [client.post("/games", json={}).json()["game_id"] for _ in range(3)]
+    assert client.post(f"/games/{game_ids[0]}/reveal", json={"row": 8, "col": 0}).status_code == 422
+    assert client.post("/games", json={}).status_code == 503
+
+    # Idle sessions make room for new ones, least recently used first
+    store = client.app.state.store
+    store.idle_timeout = 0
+    assert client.post("/games", json={}).status_code == 200
+    assert len(store.sessions) == 1
+    assert client.get("/stats").json() == {"sessions": 1, "max_sessions": 3}
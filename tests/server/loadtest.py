@@ -0,0 +1,66 @@
+"""
+Load test for the game server: many concurrent bots, each playing whole games with random reveals.
+Start the server first (python -m src.server.app), then run:
+    python tests/server/loadtest.py --games 5000 --concurrency 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+
+
+async def play_game(client: httpx.AsyncClient, args, latencies, results):
+    async def call(method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response.json()
+
+    game = await call("POST", "/games", json={"rows": args.rows, "cols": args.cols, "mines": args.mines})
+    game_id = game["game_id"]
+    game = await call("POST", f"/games/{game_id}/reveal", json={"row": args.rows // 2, "col": args.cols // 2})
+    while game["status"] == "playing":
+        hidden = [(r, c) for r, row in enumerate(game["board"]) for c, cell in enumerate(row) if cell == "*"]
+        r, c = random.choice(hidden)
+        game = await call("POST", f"/games/{game_id}/reveal", json={"row": r, "col": c})
+    await call("DELETE", f"/games/{game_id}")
+    results[game["status"]] = results.get(game["status"], 0) + 1
+
+
+async def main(args):
+    latencies, results = [], {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        async def bounded_game():
+            async with semaphore:
+                await play_game(client, args, latencies, results)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(bounded_game() for _ in range(args.games)))
+        elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print(f"{args.games} games ({results}) with {args.concurrency} concurrent bots in {elapsed:.2f}s")
+    print(f"{len(latencies)} requests, {len(latencies) / elapsed:.0f} req/s, {args.games / elapsed:.1f} games/s")
+    print(f"Request latency: p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the Minesweeper game server.")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="Server URL")
+    parser.add_argument("--games", type=int, default=1000, help="Games to play in total (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Games in flight at once (default: 200)")
+    parser.add_argument("--rows", type=int, default=8, help="Board rows (default: 8)")
+    parser.add_argument("--cols", type=int, default=8, help="Board columns (default: 8)")
+    parser.add_argument("--mines", type=int, default=10, help="Mines per board (default: 10)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))